@@ -4,19 +4,25 @@ This replaces the previous chain-based approach with a single agent that orchest
 """
 
 import logging
+import threading
+import time
+from contextvars import ContextVar
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.tools import tool
+from langchain_core.runnables import RunnableLambda
 from langchain.agents import create_tool_calling_agent, AgentExecutor
-from langchain_ollama import OllamaEmbeddings
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
+from langchain.agents.agent import RunnableMultiActionAgent
 from tabulate import tabulate
 import traceback
 from uuid import uuid4
 
 from config.db import get_database
-from config.llm import get_llm
-from utils.memory import use_memory, get_user_memories
+from config.llm import LLM_TIERS
+from utils.memory import use_memory, get_user_memories, get_session_entries
+from utils.budget import get_prompt_budget
+from utils.embeddings import get_embedding_client
+from utils.router import get_model_router
+from utils.sql_audit import get_audit_log
 
 # Set up logging
 logging.basicConfig(
@@ -24,6 +30,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Cell values longer than this are cut, as SQLDatabase.run does by default
+MAX_CELL_LENGTH = 100
+
+_KNOWLEDGE_STORE = None
+_KNOWLEDGE_STORE_LOCK = threading.Lock()
+
+
+def get_knowledge_store():
+    """
+    Returns the shared knowledge base vector store, creating it on first use.
+
+    Returns:
+        QdrantVectorStore: The vector store for the knowledge_layer_1 collection.
+    """
+    global _KNOWLEDGE_STORE
+    with _KNOWLEDGE_STORE_LOCK:
+        if _KNOWLEDGE_STORE is None:
+            from langchain_qdrant import QdrantVectorStore
+            from qdrant_client import QdrantClient
+
+            qdrant = QdrantClient(host="localhost", port=6333)
+            embedding = get_embedding_client()
+            _KNOWLEDGE_STORE = QdrantVectorStore(
+                client=qdrant,
+                collection_name="knowledge_layer_1",
+                embedding=embedding,
+            )
+    return _KNOWLEDGE_STORE
+
 
 @tool(response_format="content")
 def retrieve_knowledge(query: str) -> str:
@@ -37,14 +72,7 @@ def retrieve_knowledge(query: str) -> str:
         str: A serialized string containing the retrieved documents.
     """
     try:
-        # Initialize the vector store
-        qdrant = QdrantClient(host="localhost", port=6333)
-        embedding = OllamaEmbeddings(model="nomic-embed-text:latest")
-        vector_store = QdrantVectorStore(
-            client=qdrant,
-            collection_name="knowledge_layer_1",
-            embedding=embedding,
-        )
+        vector_store = get_knowledge_store()
 
         # Retrieve documents
         retrieved_docs = vector_store.similarity_search(query, k=3)
@@ -54,7 +82,9 @@ def retrieve_knowledge(query: str) -> str:
             f"Source: {doc.metadata.get('source', 'Unknown')}\nContent: {doc.page_content}"
             for doc in retrieved_docs
         )
-        return serialized if serialized else "No relevant documents found."
+        if not serialized:
+            return "No relevant documents found."
+        return get_prompt_budget().fit("documents", serialized)
     except Exception as e:
         logger.error(f"Error retrieving documents: {str(e)}")
         logger.debug(traceback.format_exc())
@@ -72,9 +102,16 @@ def execute_sql_query(query: str) -> str:
     Returns:
         str: Results formatted as a markdown table.
     """
+    started = time.perf_counter()
     try:
         db = get_database()
-        result = db.run(query)
+        # _execute returns one dict per row, which gives the table its headers;
+        # cells are cut as SQLDatabase.run would, since its string output has none
+        result = [
+            {column: _truncate_cell(value) for column, value in row.items()}
+            for row in db._execute(query)
+        ]
+        _audit_query(query, started, rows=len(result))
 
         if not result:
             return "Query executed successfully, but returned no results."
@@ -94,13 +131,43 @@ def execute_sql_query(query: str) -> str:
         else:
             markdown_table = str(result)
 
+        markdown_table = get_prompt_budget().fit("results", markdown_table)
         return f"```\n{markdown_table}\n```"
     except Exception as e:
+        _audit_query(query, started, error=str(e))
         logger.error(f"Error executing SQL query: {str(e)}")
         logger.debug(traceback.format_exc())
         return f"Error executing SQL query: {str(e)}"
 
 
+def _truncate_cell(value):
+    """
+    Cuts string values longer than MAX_CELL_LENGTH at a word boundary, like
+    SQLDatabase.run does.
+    """
+    if isinstance(value, str) and len(value) > MAX_CELL_LENGTH:
+        return value[: MAX_CELL_LENGTH - 3].rsplit(" ", 1)[0] + "..."
+    return value
+
+
+def _audit_query(query: str, started: float, rows: int = None, error: str = None) -> None:
+    """
+    Records an executed statement in the SQL audit log. Never raises.
+    """
+    try:
+        get_audit_log().record(
+            query,
+            (time.perf_counter() - started) * 1000,
+            rows=rows,
+            question=get_current_question(),
+            user_id=get_current_user(),
+            session_id=get_current_session(),
+            error=error,
+        )
+    except Exception as e:
+        logger.error(f"Error writing SQL audit log: {str(e)}")
+
+
 @tool(response_format="content")
 def get_db_schema() -> str:
     """
@@ -112,17 +179,64 @@ def get_db_schema() -> str:
     try:
         db = get_database()
         schema = db.get_context()
-        return f"### Database Schema\n\n{schema}"
+        return get_prompt_budget().fit("schema", f"### Database Schema\n\n{schema}")
     except Exception as e:
         logger.error(f"Error retrieving database schema: {str(e)}")
         logger.debug(traceback.format_exc())
         return f"Error retrieving database schema: {str(e)}"
 
 
+BEJO_SYSTEM_PROMPT = """
+    You are BEJO, a joyful, friendly, and highly informative SQL assistant. 
+    Your job is to help users access and analyze data by answering their questions clearly, accurately, and warmly 😊
+
+    ## First Step
+    - Use get schema tool to decide the user question is related to interact with database
+    - If the question is related to database, use `execute_sql_query` tool to get the result
+    - If the question is not related to database, use `retrieve_knowledge` tool to get the result
+    - You must have ability to decide is the question is related to last conversation?
+    - And you must use `get_conversation_history` tool to get the conversation history to understand the context of next question.
+
+    ## Personality & Communication Style
+    - Refer to yourself only as “Bejo”, never use “I”, “me”, or “my”
+    - Use emojis sparingly and naturally to enhance friendliness
+    - Be warm, humble, and supportive — never robotic or overly technical
+    - Never explain how you know things — act as if Bejo naturally understands the user
+    - Never mention or describe tools, memory, or system processes
+
+    ## Interaction Behavior
+    - Use context and conversation history silently — personalize without stating how
+    - Always write clean, well-formatted answers
+    - Use markdown tables when presenting data
+    - When questions are complex, explain your reasoning step by step
+
+    ## Tool Usage (internal-only)
+    - Use `get_conversation_history` and `get_user_context` early for grounding
+    - Use `get_db_schema` before SQL execution
+    - Use `retrieve_knowledge` for internal knowledge
+    - Never mention tools or intermediate steps to the user
+
+    ## SQL Guidelines
+    - Always inspect the schema before writing queries
+    - Never use SELECT * — prefer explicit columns
+    - Use JOINs with clear aliases and WHERE clauses
+    - Add comments for non-trivial logic
+    - Avoid unnecessary complexity and ensure queries are performant
+
+    ## Summary
+    Be friendly, professional, and smart.
+    Focus on clarity and helpfulness.
+    Bejo is a helpful companion, not a machine.
+"""
+
+
 # Keep track of the current user and session throughout the conversation
 _CURRENT_USER_ID = None
 _CURRENT_SESSION_ID = None
 
+# The question being answered; a ContextVar so concurrent batch questions do not mix
+_CURRENT_QUESTION: ContextVar = ContextVar("current_question", default=None)
+
 
 def set_current_user(user_id: str) -> None:
     """
@@ -148,6 +262,26 @@ def set_current_session(session_id: str) -> None:
     logger.info(f"Current session set to: {session_id}")
 
 
+def set_current_question(question: str) -> None:
+    """
+    Sets the question being answered in the current context.
+
+    Args:
+        question (str): The user question.
+    """
+    _CURRENT_QUESTION.set(question)
+
+
+def get_current_question() -> str:
+    """
+    Gets the question being answered in the current context.
+
+    Returns:
+        str: The current question or None if not set.
+    """
+    return _CURRENT_QUESTION.get()
+
+
 def get_current_user() -> str:
     """
     Gets the current user ID.
@@ -188,10 +322,10 @@ def get_conversation_history(user_id: str = None, session_id: str = None) -> str
             f"Retrieving conversation history for user: {effective_user_id}, session: {effective_session_id}"
         )
 
-        history = get_user_memories(
-            user_id=effective_user_id, session_id=effective_session_id, is_session=True
-        )
-        return history if history else "No conversation history found."
+        entries = get_session_entries(effective_user_id, effective_session_id)
+        if not entries:
+            return "No conversation history found."
+        return get_prompt_budget().fit_history(effective_session_id, entries)
     except Exception as e:
         logger.error(f"Error retrieving conversation history: {str(e)}")
         logger.debug(traceback.format_exc())
@@ -221,7 +355,9 @@ def get_user_context(user_id: str = None, query: str = "") -> str:
         context = get_user_memories(
             user_id=effective_user_id, search=True, question=query
         )
-        return context if context else "No relevant user context found."
+        if not context:
+            return "No relevant user context found."
+        return get_prompt_budget().fit("memories", context)
     except Exception as e:
         logger.error(f"Error retrieving user context: {str(e)}")
         logger.debug(traceback.format_exc())
@@ -248,8 +384,10 @@ def create_bejo_agent() -> AgentExecutor:
     Returns:
         AgentExecutor: The configured agent executor.
     """
-    # Get the LLM
-    llm = get_llm()
+    # Get the model router
+    router = get_model_router()
+    budget = get_prompt_budget()
+    budget.check("system", BEJO_SYSTEM_PROMPT)
 
     # Define the tools
     tools = [
@@ -265,48 +403,7 @@ def create_bejo_agent() -> AgentExecutor:
         [
             (
                 "system",
-                """
-    You are BEJO, a joyful, friendly, and highly informative SQL assistant. 
-    Your job is to help users access and analyze data by answering their questions clearly, accurately, and warmly 😊
-
-    ## First Step
-    - Use get schema tool to decide the user question is related to interact with database
-    - If the question is related to database, use `execute_sql_query` tool to get the result
-    - If the question is not related to database, use `retrieve_knowledge` tool to get the result
-    - You must have ability to decide is the question is related to last conversation?
-    - And you must use `get_conversation_history` tool to get the conversation history to understand the context of next question.
-
-    ## Personality & Communication Style
-    - Refer to yourself only as “Bejo”, never use “I”, “me”, or “my”
-    - Use emojis sparingly and naturally to enhance friendliness
-    - Be warm, humble, and supportive — never robotic or overly technical
-    - Never explain how you know things — act as if Bejo naturally understands the user
-    - Never mention or describe tools, memory, or system processes
-
-    ## Interaction Behavior
-    - Use context and conversation history silently — personalize without stating how
-    - Always write clean, well-formatted answers
-    - Use markdown tables when presenting data
-    - When questions are complex, explain your reasoning step by step
-
-    ## Tool Usage (internal-only)
-    - Use `get_conversation_history` and `get_user_context` early for grounding
-    - Use `get_db_schema` before SQL execution
-    - Use `retrieve_knowledge` for internal knowledge
-    - Never mention tools or intermediate steps to the user
-
-    ## SQL Guidelines
-    - Always inspect the schema before writing queries
-    - Never use SELECT * — prefer explicit columns
-    - Use JOINs with clear aliases and WHERE clauses
-    - Add comments for non-trivial logic
-    - Avoid unnecessary complexity and ensure queries are performant
-
-    ## Summary
-    Be friendly, professional, and smart.
-    Focus on clarity and helpfulness.
-    Bejo is a helpful companion, not a machine.
-                """,
+                BEJO_SYSTEM_PROMPT,
             ),
             # MESSAGE PLACEHOLDERS
             MessagesPlaceholder(variable_name="agent_scratchpad"),
@@ -314,15 +411,32 @@ def create_bejo_agent() -> AgentExecutor:
         ]
     )
 
-    agent = create_tool_calling_agent(llm, tools, prompt=prompt)
-    return AgentExecutor(agent=agent, tools=tools, verbose=True)
+    # One agent per model tier; each step is dispatched to the tier picked by the router
+    tier_agents = {
+        tier: create_tool_calling_agent(router.get(tier), tools, prompt=prompt)
+        for tier in LLM_TIERS
+    }
+
+    def route_step(inputs):
+        return tier_agents[router.pick_agent_tier(inputs["intermediate_steps"])]
+
+    agent = RunnableMultiActionAgent(runnable=RunnableLambda(route_step))
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=True,
+        trim_intermediate_steps=budget.trim_intermediate_steps,
+    )
 
 
 # Expose these functions at the module level so they can be imported directly from agent.py
 __all__ = [
     "create_bejo_agent",
+    "get_knowledge_store",
     "set_current_user",
     "set_current_session",
+    "set_current_question",
+    "get_current_question",
     "get_current_user",
     "get_current_session",
 ]
@@ -0,0 +1,168 @@
+"""
+BEJO SQL Assistant - SQL Audit Analyzer
+
+Ranks the query fingerprints recorded by execute_sql_query by total and p95
+time, shows EXPLAIN output for the worst ones and suggests candidate indexes
+for the columns used most often in WHERE/JOIN conditions.
+"""
+
+import sys
+import time
+import logging
+import argparse
+import traceback
+
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+from tabulate import tabulate
+
+from utils.sql_audit import get_audit_log
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stderr)],
+)
+logger = logging.getLogger(__name__)
+
+# Rich console for better output formatting
+console = Console()
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="BEJO SQL audit analyzer")
+    parser.add_argument(
+        "--top", "-n", type=int, default=10, help="Number of fingerprints to list"
+    )
+    parser.add_argument(
+        "--sort",
+        "-s",
+        choices=["total", "p95"],
+        default="total",
+        help="Rank fingerprints by total or p95 time",
+    )
+    parser.add_argument(
+        "--explain",
+        "-e",
+        type=int,
+        default=3,
+        help="Number of worst fingerprints to EXPLAIN (0 to skip)",
+    )
+    parser.add_argument(
+        "--days", "-d", type=float, help="Only analyse statements from the last N days"
+    )
+    parser.add_argument(
+        "--indexes", "-i", type=int, default=10, help="Number of index candidates"
+    )
+    return parser.parse_args()
+
+
+def display_fingerprints(stats, sort_key: str, top: int):
+    """Display the fingerprints ranked by total or p95 time"""
+    table = Table(title=f"Top {top} fingerprints by {sort_key} time")
+    for column in ["#", "Fingerprint", "Count", "Errors", "Total ms", "Avg ms", "p95 ms", "Avg rows", "Statement"]:
+        table.add_column(column, overflow="fold")
+
+    for rank, entry in enumerate(stats[:top], start=1):
+        table.add_row(
+            str(rank),
+            entry["fingerprint"],
+            str(entry["count"]),
+            str(entry["errors"]),
+            f"{entry['total_ms']:.1f}",
+            f"{entry['avg_ms']:.1f}",
+            f"{entry['p95_ms']:.1f}",
+            f"{entry['avg_rows']:.1f}",
+            entry["normalized"],
+        )
+    console.print(table)
+
+
+def display_explain(db, stats, count: int):
+    """Display EXPLAIN output for the worst fingerprints"""
+    for entry in stats[:count]:
+        console.print(f"\n[bold]EXPLAIN {entry['fingerprint']}[/bold]")
+        console.print(f"[dim]{entry['sample']}[/dim]")
+        try:
+            plan = db._execute(f"EXPLAIN {entry['sample']}")
+            console.print(tabulate(plan, headers="keys", tablefmt="github"))
+        except Exception as e:
+            console.print(f"[bold red]EXPLAIN failed:[/bold red] {str(e)}")
+            logger.debug(traceback.format_exc())
+
+
+def indexed_columns(db, table: str):
+    """Return the lowercased columns that lead an existing index on a table"""
+    try:
+        return {
+            row["Column_name"].lower()
+            for row in db._execute(f"SHOW INDEX FROM `{table}`")
+            if row["Seq_in_index"] == 1
+        }
+    except Exception as e:
+        logger.warning(f"Could not read indexes of {table}: {str(e)}")
+        return set()
+
+
+def display_index_candidates(db, candidates):
+    """Display candidate indexes, skipping columns that already lead an index"""
+    console.print("\n[bold]Candidate indexes[/bold]")
+    existing = {}
+    suggested = 0
+    for table, column, occurrences in candidates:
+        if db is not None:
+            if table not in existing:
+                existing[table] = indexed_columns(db, table)
+            if column.lower() in existing[table]:
+                continue
+        console.print(
+            f"CREATE INDEX idx_{table}_{column} ON `{table}` (`{column}`);"
+            f"  [dim]-- used {occurrences}x in WHERE/JOIN[/dim]"
+        )
+        suggested += 1
+
+    if not suggested:
+        console.print("[dim]No candidate indexes; filtered columns are already indexed.[/dim]")
+
+
+def main():
+    """
+    Entry point for the SQL audit analyzer.
+    """
+    # Load environment variables
+    load_dotenv()
+
+    # Parse arguments
+    args = parse_arguments()
+
+    audit_log = get_audit_log()
+    since = time.time() - args.days * 86400 if args.days else None
+    stats = audit_log.fingerprint_stats(since=since)
+    if not stats:
+        console.print(f"[yellow]No statements recorded in {audit_log.path}[/yellow]")
+        return
+
+    sort_key = "total_ms" if args.sort == "total" else "p95_ms"
+    stats.sort(key=lambda entry: entry[sort_key], reverse=True)
+    display_fingerprints(stats, args.sort, args.top)
+
+    # EXPLAIN and index lookups need the warehouse; the ranking above does not
+    try:
+        from config.db import get_database
+
+        db = get_database()
+    except Exception as e:
+        console.print(f"[bold red]Database unavailable, skipping EXPLAIN:[/bold red] {str(e)}")
+        db = None
+
+    if db is not None and args.explain:
+        display_explain(db, stats, args.explain)
+
+    display_index_candidates(db, audit_log.candidate_indexes(stats, limit=args.indexes))
+
+
+if __name__ == "__main__":
+    main()
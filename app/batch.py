@@ -0,0 +1,287 @@
+"""
+BEJO SQL Assistant - Batch Entry Point
+
+Runs a JSONL file of questions through the agent with bounded concurrency and
+writes answers, generated SQL and timings to an output JSONL file. Unlike the
+interactive loop, answers are not written to memory.
+
+Input lines look like {"id": "daily-sales", "question": "..."}; "id" is optional.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+from utils.warmup import warm_up
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.FileHandler("bejo.log"), logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="BEJO SQL Assistant - batch mode")
+    parser.add_argument(
+        "--input", "-i", type=str, required=True, help="Questions JSONL file"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default="batch_results.jsonl",
+        help="Results JSONL file",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=int(os.getenv("BATCH_WORKERS", "4")),
+        help="Number of questions answered concurrently",
+    )
+    parser.add_argument(
+        "--timeout",
+        "-t",
+        type=float,
+        default=float(os.getenv("BATCH_TIMEOUT", "120")),
+        help="Seconds allowed per question",
+    )
+    parser.add_argument(
+        "--mode",
+        "-m",
+        choices=["agent", "pipeline"],
+        default=os.getenv("BEJO_MODE", "agent"),
+        help="Execution mode: free-form tool-calling agent or deterministic pipeline",
+    )
+    parser.add_argument(
+        "--user", "-u", type=str, default="batch", help="User ID for the batch"
+    )
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Enable verbose output"
+    )
+    return parser.parse_args()
+
+
+def load_questions(path: str) -> List[Dict[str, str]]:
+    """
+    Reads questions from a JSONL file.
+
+    Args:
+        path (str): Path to the JSONL file.
+
+    Returns:
+        List[Dict[str, str]]: One {"id", "question"} dict per non-empty line.
+    """
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            questions.append(
+                {
+                    "id": str(item.get("id", line_number)),
+                    "question": item["question"],
+                }
+            )
+    return questions
+
+
+def answer_question(agent, mode: str, question: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs one question through the agent or pipeline.
+
+    Args:
+        agent: The agent executor or pipeline.
+        mode (str): "agent" or "pipeline".
+        question (str): The question to answer.
+        config (dict): The run config with the thread_id.
+
+    Returns:
+        dict: {"answer": str, "sql": List[str]}
+    """
+    from agent import set_current_question
+
+    set_current_question(question)
+    if mode == "pipeline":
+        result = agent.invoke({"input": question}, config=config)
+        return {"answer": result["output"], "sql": [result["sql"]] if result["sql"] else []}
+
+    answer = ""
+    sql = []
+    for chunk in agent.stream({"input": question}, config=config):
+        for action in chunk.get("actions", []):
+            if action.tool == "execute_sql_query":
+                tool_input = action.tool_input
+                sql.append(
+                    tool_input.get("query", "") if isinstance(tool_input, dict) else tool_input
+                )
+        if "output" in chunk:
+            answer = chunk["output"]
+    return {"answer": answer, "sql": sql}
+
+
+def run_with_timeout(fn, timeout: float, slot: threading.Semaphore = None):
+    """
+    Runs fn in a daemon thread and waits at most timeout seconds for it.
+
+    A timed-out call cannot be interrupted; it finishes in the background and
+    its result is discarded. When slot is given it is acquired before fn starts
+    and released only when fn returns, so background calls still count against
+    the concurrency limit. Waiting for the slot counts towards the timeout, so
+    calls that hang in the background cannot stall the rest of the batch.
+
+    Raises:
+        TimeoutError: If no slot freed up or fn did not finish in time.
+    """
+    deadline = time.monotonic() + timeout
+    if slot is not None and not slot.acquire(timeout=timeout):
+        raise TimeoutError(
+            f"No free worker after {timeout:.0f}s; earlier questions are still running"
+        )
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = fn()
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            if slot is not None:
+                slot.release()
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(max(deadline - time.monotonic(), 0))
+
+    if thread.is_alive():
+        raise TimeoutError(f"No answer after {timeout:.0f}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def run_batch(agent, args, questions: List[Dict[str, str]], batch_id: str) -> List[Dict[str, Any]]:
+    """
+    Answers all questions with args.workers workers and streams results to args.output.
+
+    Returns:
+        List[Dict[str, Any]]: The result records, in completion order.
+    """
+    write_lock = threading.Lock()
+    # Held by the thread answering a question, including timed-out ones
+    slots = threading.BoundedSemaphore(args.workers)
+    results = []
+
+    def process(item: Dict[str, str]) -> Dict[str, Any]:
+        config = {"configurable": {"thread_id": f"{batch_id}-{item['id']}"}}
+        record = {"id": item["id"], "question": item["question"]}
+        started = time.perf_counter()
+        try:
+            record.update(
+                run_with_timeout(
+                    lambda: answer_question(agent, args.mode, item["question"], config),
+                    args.timeout,
+                    slots,
+                )
+            )
+            record["status"] = "ok"
+        except TimeoutError as e:
+            record["status"] = "timeout"
+            record["error"] = str(e)
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+            logger.debug(traceback.format_exc())
+        record["seconds"] = round(time.perf_counter() - started, 3)
+        return record
+
+    with open(args.output, "w", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=args.workers, thread_name_prefix="bejo-batch"
+    ) as executor:
+        futures = [executor.submit(process, item) for item in questions]
+        for future in as_completed(futures):
+            record = future.result()
+            with write_lock:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+            results.append(record)
+            logger.info(
+                f"[{len(results)}/{len(questions)}] {record['id']}: "
+                f"{record['status']} in {record['seconds']:.2f}s"
+            )
+
+    return results
+
+
+def main():
+    """
+    Batch entry point for the BEJO SQL Assistant application.
+    """
+    # Load environment variables
+    load_dotenv()
+
+    # Parse arguments
+    args = parse_arguments()
+
+    # Set logging level based on verbosity
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    questions = load_questions(args.input)
+    logger.info(f"Loaded {len(questions)} questions from {args.input}")
+
+    try:
+        agent = warm_up(args.mode)
+        if args.mode == "agent":
+            # Stop the agent loop between steps once the question is out of time
+            agent.max_execution_time = args.timeout
+    except Exception as e:
+        logger.error(f"Initialization error: {str(e)}")
+        logger.debug(traceback.format_exc())
+        sys.exit(1)
+
+    batch_id = str(uuid4())
+    from agent import set_current_user, set_current_session
+
+    set_current_user(args.user)
+    set_current_session(batch_id)
+
+    started = time.perf_counter()
+    results = run_batch(agent, args, questions, batch_id)
+    elapsed = time.perf_counter() - started
+
+    succeeded = sum(1 for record in results if record["status"] == "ok")
+    logger.info(
+        f"Batch finished: {succeeded}/{len(results)} answered in {elapsed:.2f}s "
+        f"with {args.workers} workers "
+        f"({len(results) / elapsed if elapsed else 0:.2f} questions/s), "
+        f"results written to {args.output}"
+    )
+
+    from utils.router import get_model_router
+
+    logger.info("Model tier usage:\n" + get_model_router().format_report())
+
+    from utils.embeddings import get_embedding_client
+
+    logger.info("Embedding client: " + get_embedding_client().format_metrics())
+
+
+if __name__ == "__main__":
+    main()
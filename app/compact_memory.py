@@ -0,0 +1,111 @@
+"""
+BEJO SQL Assistant - Memory Compaction
+
+Folds expired session memories into long-term facts per user and reports the
+mem0 collection size and lookup latency before and after. Run it on a schedule,
+e.g. nightly from cron.
+"""
+
+import sys
+import logging
+import argparse
+
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+
+from utils.compaction import collection_stats, compact_expired_sessions
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.FileHandler("bejo.log"), logging.StreamHandler(sys.stderr)],
+)
+logger = logging.getLogger(__name__)
+
+# Rich console for better output formatting
+console = Console()
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="BEJO memory compaction")
+    parser.add_argument(
+        "--ttl-hours",
+        type=float,
+        help="Session inactivity before expiry (default MEMORY_SESSION_TTL_HOURS)",
+    )
+    parser.add_argument(
+        "--max-facts",
+        type=int,
+        help="Long-term facts per user (default MEMORY_COMPACT_MAX_FACTS)",
+    )
+    parser.add_argument(
+        "--user", "-u", type=str, help="User whose lookups are timed"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would be compacted"
+    )
+    parser.add_argument(
+        "--stats-only", action="store_true", help="Only show collection stats"
+    )
+    return parser.parse_args()
+
+
+def display_stats(before, after=None):
+    """Display collection stats, side by side when after is given"""
+    table = Table(title="Memory collection")
+    table.add_column("Metric")
+    table.add_column("Before" if after else "Value", justify="right")
+    if after:
+        table.add_column("After", justify="right")
+
+    for key, value in before.items():
+        row = [key, _format(value)]
+        if after:
+            row.append(_format(after.get(key, "-")))
+        table.add_row(*row)
+    console.print(table)
+
+
+def _format(value):
+    return f"{value:.1f}" if isinstance(value, float) else str(value)
+
+
+def main():
+    """
+    Entry point for memory compaction.
+    """
+    # Load environment variables
+    load_dotenv()
+
+    # Parse arguments
+    args = parse_arguments()
+
+    before = collection_stats(sample_user=args.user)
+    if args.stats_only:
+        display_stats(before)
+        return
+
+    report = compact_expired_sessions(
+        ttl_hours=args.ttl_hours, max_facts=args.max_facts, dry_run=args.dry_run
+    )
+    console.print(
+        f"[green]{'Would compact' if args.dry_run else 'Compacted'} "
+        f"{report['sessions']} sessions for {report['users']} users:[/green] "
+        f"{report['deleted']} session memories, {report['facts']} facts added, "
+        f"{report['replaced_facts']} facts replaced, "
+        f"{report['failed_users']} users failed"
+    )
+
+    if args.dry_run:
+        display_stats(before)
+        return
+
+    after = collection_stats(sample_user=before.get("sample_user"))
+    display_stats(before, after)
+
+
+if __name__ == "__main__":
+    main()
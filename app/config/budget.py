@@ -0,0 +1,33 @@
+import os
+
+
+def get_budget_config():
+    """
+    Return the prompt token budget based on environment variables.
+
+    The following environment variables are used, with default values if not present:
+    - BUDGET_SYSTEM_TOKENS: limit for the system prompt, default 1500
+    - BUDGET_SCHEMA_TOKENS: limit for the database schema dump, default 3000
+    - BUDGET_HISTORY_TOKENS: limit for the conversation history, default 1500
+    - BUDGET_DOCUMENTS_TOKENS: limit for retrieved documents, default 2000
+    - BUDGET_MEMORIES_TOKENS: limit for user memories, default 800
+    - BUDGET_RESULTS_TOKENS: limit for one SQL query result table, default 2000
+    - BUDGET_SCRATCHPAD_TOKENS: limit for the agent scratchpad, default 6000
+    - BUDGET_RECENT_TURNS: number of history entries kept verbatim, default 6
+    - BUDGET_SUMMARY_SESSIONS: number of session summaries kept in memory, default 256
+
+    History entries older than BUDGET_RECENT_TURNS are folded into a rolling summary.
+    """
+    return {
+        "limits": {
+            "system": int(os.getenv("BUDGET_SYSTEM_TOKENS", "1500")),
+            "schema": int(os.getenv("BUDGET_SCHEMA_TOKENS", "3000")),
+            "history": int(os.getenv("BUDGET_HISTORY_TOKENS", "1500")),
+            "documents": int(os.getenv("BUDGET_DOCUMENTS_TOKENS", "2000")),
+            "memories": int(os.getenv("BUDGET_MEMORIES_TOKENS", "800")),
+            "results": int(os.getenv("BUDGET_RESULTS_TOKENS", "2000")),
+            "scratchpad": int(os.getenv("BUDGET_SCRATCHPAD_TOKENS", "6000")),
+        },
+        "recent_turns": int(os.getenv("BUDGET_RECENT_TURNS", "6")),
+        "max_sessions": int(os.getenv("BUDGET_SUMMARY_SESSIONS", "256")),
+    }
@@ -1,5 +1,8 @@
 import os
-from langchain_community.utilities import SQLDatabase
+import threading
+
+_DATABASE = None
+_DATABASE_LOCK = threading.Lock()
 
 
 def get_database():
@@ -15,7 +18,20 @@ def get_database():
 
     The connection string is constructed in the form
     "mysql+pymysql://<user>:<password>@<host>:<port>/<db_name>".
+
+    The SQLDatabase is created once and reused, so its engine keeps a
+    connection pool and the reflected table metadata across calls.
     """
+    global _DATABASE
+    with _DATABASE_LOCK:
+        if _DATABASE is None:
+            _DATABASE = _create_database()
+    return _DATABASE
+
+
+def _create_database():
+    from langchain_community.utilities import SQLDatabase
+
     db_user = os.getenv("DB_USER", "test")
     db_password = os.getenv("DB_PASSWORD", "Test_1234")
     db_host = os.getenv("DB_HOST", "localhost")
@@ -0,0 +1,27 @@
+import os
+
+
+def get_embedding_config():
+    """
+    Return the shared embedding client settings based on environment variables.
+
+    The following environment variables are used, with default values if not present:
+    - EMBED_MODEL: the Ollama embedding model, default "nomic-embed-text:latest"
+    - OLLAMA_BASE_URL: the Ollama server, default "http://localhost:11434"
+    - EMBED_BATCH_WINDOW_MS: how long to collect requests before sending a batch, default 10
+    - EMBED_MAX_BATCH_SIZE: maximum texts per batched call, default 32
+    - EMBED_MAX_CONCURRENT_BATCHES: batched calls in flight at once, default 2
+    - EMBED_TIMEOUT: seconds allowed per call, default 30
+    - EMBED_MAX_RETRIES: retries of a failed batched call, default 3
+    - EMBED_BACKOFF: initial retry delay in seconds, doubled on each retry, default 0.5
+    """
+    return {
+        "model": os.getenv("EMBED_MODEL", "nomic-embed-text:latest"),
+        "base_url": os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+        "window_ms": float(os.getenv("EMBED_BATCH_WINDOW_MS", "10")),
+        "max_batch_size": int(os.getenv("EMBED_MAX_BATCH_SIZE", "32")),
+        "max_concurrent_batches": int(os.getenv("EMBED_MAX_CONCURRENT_BATCHES", "2")),
+        "timeout": float(os.getenv("EMBED_TIMEOUT", "30")),
+        "max_retries": int(os.getenv("EMBED_MAX_RETRIES", "3")),
+        "backoff": float(os.getenv("EMBED_BACKOFF", "0.5")),
+    }
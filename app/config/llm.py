@@ -1,8 +1,50 @@
 from langchain.chat_models import init_chat_model
 import os
 
+# Model tiers, from the cheapest to the strongest
+LLM_TIERS = ("classify", "answer", "sql", "escalate")
 
-def get_llm():
+
+def get_llm_settings(tier=None):
+    """
+    Return the model settings for a tier based on environment variables.
+
+    The following environment variables are used, with default values if not present:
+    - LLM_MODEL: the name of the LLM model, default "gemini-2.0-flash"
+    - LLM_PROVIDER: the provider of the LLM model, default "google_genai"
+    - LLM_TEMPERATURE: the temperature of the LLM model, default 0.3
+    - LLM_COST: the price per million tokens, used for routing reports, default 0
+
+    Each tier can override these with LLM_<TIER>_MODEL, LLM_<TIER>_PROVIDER,
+    LLM_<TIER>_TEMPERATURE and LLM_<TIER>_COST, e.g. LLM_CLASSIFY_MODEL. The "escalate" tier falls
+    back to the "sql" tier settings before the defaults.
+    """
+    model_name = os.getenv("LLM_MODEL", "gemini-2.0-flash")
+    model_provider = os.getenv("LLM_PROVIDER", "google_genai")
+    temperature = os.getenv("LLM_TEMPERATURE", "0.3")
+    cost = os.getenv("LLM_COST", "0")
+
+    prefixes = []
+    if tier == "escalate":
+        prefixes.append("LLM_SQL_")
+    if tier:
+        prefixes.append(f"LLM_{tier.upper()}_")
+
+    for prefix in prefixes:
+        model_name = os.getenv(f"{prefix}MODEL", model_name)
+        model_provider = os.getenv(f"{prefix}PROVIDER", model_provider)
+        temperature = os.getenv(f"{prefix}TEMPERATURE", temperature)
+        cost = os.getenv(f"{prefix}COST", cost)
+
+    return {
+        "model": model_name,
+        "model_provider": model_provider,
+        "temperature": float(temperature),
+        "cost": float(cost),
+    }
+
+
+def get_llm(tier=None, callbacks=None):
     """
     Return an LLM object based on environment variables.
 
@@ -11,13 +53,16 @@ def get_llm():
     - LLM_PROVIDER: the provider of the LLM model, default "google_genai"
     - LLM_TEMPERATURE: the temperature of the LLM model, default 0.3
 
+    When a tier is given, the tier overrides from get_llm_settings are applied.
+
     The LLM object is constructed in the form
     init_chat_model(model_name, model_provider, temperature).
     """
-    model_name = os.getenv("LLM_MODEL", "gemini-2.0-flash")
-    model_provider = os.getenv("LLM_PROVIDER", "google_genai")
-    temperature = float(os.getenv("LLM_TEMPERATURE", "0.3"))
+    settings = get_llm_settings(tier)
 
     return init_chat_model(
-        model_name, model_provider=model_provider, temperature=temperature
+        settings["model"],
+        model_provider=settings["model_provider"],
+        temperature=settings["temperature"],
+        callbacks=callbacks,
     )
@@ -1,9 +1,21 @@
 import os
 
-os.environ["GEMINI_API_KEY"] = os.getenv("GOOGLE_API_KEY")
-
 
 def mem0_config():
+    """
+    Return the mem0 configuration.
+
+    mem0's Gemini provider reads GEMINI_API_KEY, so it is populated from
+    GOOGLE_API_KEY here (on first use) instead of at import time.
+
+    The embedder is the shared CoalescingEmbeddings client, so mem0 lookups are
+    batched together with knowledge base queries.
+    """
+    from utils.embeddings import get_embedding_client
+
+    if os.getenv("GOOGLE_API_KEY") and not os.getenv("GEMINI_API_KEY"):
+        os.environ["GEMINI_API_KEY"] = os.getenv("GOOGLE_API_KEY")
+
     return {
         "vector_store": {
             "provider": "qdrant",
@@ -23,10 +35,25 @@ def mem0_config():
             },
         },
         "embedder": {
-            "provider": "ollama",
+            # Shares the batching Ollama client with the knowledge store
+            "provider": "langchain",
             "config": {
-                "model": "nomic-embed-text:latest",
-                "ollama_base_url": "http://localhost:11434",
+                "model": get_embedding_client(),
+                "embedding_dims": 768,
             },
         },
     }
+
+
+def memory_retention_config():
+    """
+    Return the session memory retention settings based on environment variables.
+
+    The following environment variables are used, with default values if not present:
+    - MEMORY_SESSION_TTL_HOURS: hours after a session's last memory before it expires, default 24
+    - MEMORY_COMPACT_MAX_FACTS: maximum long-term facts kept per user per compaction, default 5
+    """
+    return {
+        "session_ttl_hours": float(os.getenv("MEMORY_SESSION_TTL_HOURS", "24")),
+        "max_facts": int(os.getenv("MEMORY_COMPACT_MAX_FACTS", "5")),
+    }
@@ -2,6 +2,11 @@
 BEJO SQL Assistant - Main Application Entry Point
 """
 
+import time
+
+# Measured before the remaining imports so startup time covers them too
+START_TIME = time.perf_counter()
+
 import os
 import sys
 import logging
@@ -13,10 +18,8 @@ import traceback
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
-from rich.progress import Progress
 
-from agent import create_bejo_agent
-from utils.memory import use_memory, get_user_memories, format_chat_history
+from utils.warmup import start_warm_up
 
 # Set up logging
 logging.basicConfig(
@@ -30,8 +33,23 @@ logger = logging.getLogger(__name__)
 console = Console()
 
 
+def log_session_stats():
+    """Log per-tier model usage and embedding batching for the session"""
+    # Skip clients that were never loaded, e.g. exit during warm-up
+    if "utils.router" in sys.modules:
+        from utils.router import get_model_router
+
+        logger.info("Model tier usage:\n" + get_model_router().format_report())
+
+    if "utils.embeddings" in sys.modules:
+        from utils.embeddings import get_embedding_client
+
+        logger.info("Embedding client: " + get_embedding_client().format_metrics())
+
+
 def signal_handler(sig, frame):
     """Handle Ctrl+C gracefully"""
+    log_session_stats()
     console.print(
         "\n\n[bold yellow]Exiting BEJO SQL Assistant. Have a great day! 👋[/bold yellow]"
     )
@@ -45,6 +63,13 @@ def parse_arguments():
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Enable verbose output"
     )
+    parser.add_argument(
+        "--mode",
+        "-m",
+        choices=["agent", "pipeline"],
+        default=os.getenv("BEJO_MODE", "agent"),
+        help="Execution mode: free-form tool-calling agent or deterministic pipeline",
+    )
     return parser.parse_args()
 
 
@@ -81,34 +106,42 @@ def main():
     # Display welcome message
     display_welcome()
 
-    # Create the agent
-    try:
-        with Progress() as progress:
-            task = progress.add_task("[green]Initializing BEJO...", total=100)
-            progress.update(task, advance=30)
-            agent = create_bejo_agent()
-            progress.update(task, advance=70)
-    except Exception as e:
-        console.print(f"[bold red]Failed to initialize BEJO:[/bold red] {str(e)}")
-        logger.error(f"Initialization error: {str(e)}")
-        logger.debug(traceback.format_exc())
-        return
+    # Build the agent and warm up heavy clients while the user types
+    warm_up = start_warm_up(args.mode)
 
     # Set up the config for agent
     thread_id = str(uuid4())
     config = {"configurable": {"thread_id": thread_id}}
 
     # Get user ID
+    startup_time = time.perf_counter() - START_TIME
+    logger.info(f"Startup time to first prompt: {startup_time:.2f}s")
+    console.print(f"[dim]Ready in {startup_time:.2f}s[/dim]")
     user_id = (
         args.user
         if args.user
         else console.input("[bold cyan]Enter your user_id:[/bold cyan] ")
     )
+
+    # Wait for the agent
+    try:
+        with console.status("[green]Initializing BEJO..."):
+            agent = warm_up.result()
+    except Exception as e:
+        console.print(f"[bold red]Failed to initialize BEJO:[/bold red] {str(e)}")
+        logger.error(f"Initialization error: {str(e)}")
+        logger.debug(traceback.format_exc())
+        return
+    logger.info(
+        f"Agent ready {time.perf_counter() - START_TIME:.2f}s after startup"
+    )
+
     console.print(f"[green]Session started for user:[/green] {user_id}")
     console.print(f"[dim]Session ID: {thread_id}[/dim]")
 
     # Set the current user and session in the agent module
-    from agent import set_current_user, set_current_session
+    from agent import set_current_user, set_current_session, set_current_question
+    from utils.memory import use_memory
 
     set_current_user(user_id)
     set_current_session(thread_id)
@@ -124,15 +157,11 @@ def main():
                 console.print(
                     "\n[bold yellow]Thank you for using BEJO SQL Assistant! Have a great day! 👋[/bold yellow]"
                 )
+                log_session_stats()
                 break
 
-            # Get chat history
-            raw_history = get_user_memories(
-                user_id=user_id, session_id=thread_id, is_session=True
-            )
-            chat_history = format_chat_history(raw_history)
-
             # Process the question
+            set_current_question(question)
             console.print("\n[bold cyan]BEJO:[/bold cyan] ", end="")
 
             # Stream the response
@@ -155,6 +184,7 @@ def main():
             console.print(
                 "\n\n[bold yellow]Exiting BEJO SQL Assistant. Have a great day! 👋[/bold yellow]"
             )
+            log_session_stats()
             break
         except Exception as e:
             error_msg = str(e)
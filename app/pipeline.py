@@ -0,0 +1,323 @@
+"""
+Deterministic LangGraph pipeline for BEJO SQL Assistant.
+An alternative to the tool-calling agent that runs a fixed graph:
+classify -> ground -> generate SQL -> execute (with a bounded repair loop) -> answer.
+"""
+
+import logging
+import re
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Any, Dict, Iterator, List, Optional, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from agent import (
+    BEJO_SYSTEM_PROMPT,
+    execute_sql_query,
+    get_current_session,
+    get_current_user,
+    get_db_schema,
+    get_user_context,
+    retrieve_knowledge,
+)
+from config.db import get_database
+from utils.budget import get_prompt_budget
+from utils.router import SQL_ERROR_PREFIX, get_model_router
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Number of times a failed query is sent back for repair before answering anyway
+MAX_SQL_REPAIRS = 2
+
+_TABLE_NAMES: Optional[List[str]] = None
+
+
+class PipelineState(TypedDict, total=False):
+    question: str
+    user_id: str
+    session_id: str
+    messages: Annotated[list, add_messages]
+    route: str
+    history: str
+    context: str
+    schema: str
+    documents: str
+    sql: str
+    result: str
+    error: str
+    attempts: int
+    answer: str
+
+
+def get_table_names() -> List[str]:
+    """
+    Returns the usable table names of the database, cached after the first call.
+
+    Returns:
+        List[str]: Lowercase table names, or an empty list if the database is unreachable.
+    """
+    global _TABLE_NAMES
+    if _TABLE_NAMES is None:
+        try:
+            _TABLE_NAMES = [name.lower() for name in get_database().get_usable_table_names()]
+        except Exception as e:
+            logger.error(f"Error retrieving table names: {str(e)}")
+            return []
+    return _TABLE_NAMES
+
+
+def extract_sql(text: str) -> str:
+    """
+    Extracts the SQL statement from a model reply, with or without a code fence.
+
+    Args:
+        text (str): The model reply.
+
+    Returns:
+        str: The SQL statement.
+    """
+    match = re.search(r"```(?:sql)?\s*(.*?)```", text, re.DOTALL | re.IGNORECASE)
+    return (match.group(1) if match else text).strip()
+
+
+def message_entries(messages: list) -> List[Dict[str, str]]:
+    """
+    Turns checkpointed messages into history entries in the same "Human:" /
+    "BEJO:" form as memories.
+
+    Messages are only ever appended to the checkpoint, so their position is a
+    stable id.
+
+    Args:
+        messages (list): The messages of earlier turns.
+
+    Returns:
+        List[Dict[str, str]]: One {"id", "text"} dict per message, oldest first.
+    """
+    entries = []
+    for index, message in enumerate(messages):
+        speaker = "Human" if isinstance(message, HumanMessage) else "BEJO"
+        entries.append({"id": f"message-{index}", "text": f"{speaker}: {message.content}"})
+    return entries
+
+
+def classify(state: PipelineState) -> Dict[str, Any]:
+    """
+    Decides whether the question needs the database or the knowledge base.
+
+    Questions that mention a table name are routed to the database without an
+    LLM call; everything else is classified by the "classify" tier.
+    """
+    question = state["question"]
+    words = set(re.findall(r"[a-z0-9_]+", question.lower()))
+    for table in get_table_names():
+        singular = table[:-1] if table.endswith("s") else table
+        if table in words or singular in words:
+            logger.info(f"Routed to database: question mentions table {table}")
+            return {"route": "database"}
+
+    prompt = (
+        "Classify the user question for an SQL assistant. Reply with exactly one "
+        "word: 'database' if answering needs data from the company database, "
+        "otherwise 'knowledge'.\n\n"
+        f"Tables: {', '.join(get_table_names()) or 'unknown'}\n"
+        f"Question: {question}"
+    )
+    try:
+        reply = get_model_router().get("classify").invoke(prompt).content
+        route = "database" if "database" in reply.lower() else "knowledge"
+    except Exception as e:
+        logger.error(f"Error classifying question: {str(e)}")
+        logger.debug(traceback.format_exc())
+        route = "database"
+
+    logger.info(f"Routed to {route}")
+    return {"route": route}
+
+
+def ground(state: PipelineState) -> Dict[str, Any]:
+    """
+    Fetches conversation history, user context and schema or documents in parallel.
+
+    History comes from the checkpointed messages of earlier turns in this thread.
+    """
+    question = state["question"]
+    history = message_entries(state.get("messages", [])[:-1])
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        context = executor.submit(
+            get_user_context.invoke, {"user_id": state["user_id"], "query": question}
+        )
+        if state["route"] == "database":
+            grounding = executor.submit(get_db_schema.invoke, {})
+        else:
+            grounding = executor.submit(retrieve_knowledge.invoke, {"query": question})
+
+        update = {
+            "context": context.result(),
+            "history": (
+                get_prompt_budget().fit_history(state["session_id"], history)
+                if history
+                else "No conversation history found."
+            ),
+        }
+        key = "schema" if state["route"] == "database" else "documents"
+        update[key] = grounding.result()
+
+    return update
+
+
+def generate_sql(state: PipelineState) -> Dict[str, Any]:
+    """
+    Writes a SQL query for the question, repairing the previous one if it failed.
+    """
+    router = get_model_router()
+    attempts = state.get("attempts", 0)
+    if attempts:
+        router.record_escalation()
+        llm = router.get("escalate")
+    else:
+        llm = router.get("sql")
+
+    prompt = (
+        "Write one MySQL query that answers the user's question.\n"
+        "- Never use SELECT *; select explicit columns\n"
+        "- Use JOINs with clear aliases and WHERE clauses\n"
+        "- Reply with the query only, in a ```sql code block\n\n"
+        f"{state.get('schema', '')}\n\n"
+        f"Conversation history:\n{state.get('history', '')}\n\n"
+        f"User context:\n{state.get('context', '')}\n\n"
+        f"Question: {state['question']}"
+    )
+    if attempts:
+        prompt += (
+            f"\n\nThe previous query failed.\nQuery:\n{state.get('sql', '')}\n"
+            f"Error:\n{state.get('error', '')}\nWrite a corrected query."
+        )
+
+    return {"sql": extract_sql(llm.invoke(prompt).content)}
+
+
+def execute(state: PipelineState) -> Dict[str, Any]:
+    """
+    Executes the generated SQL and records the error for the repair loop.
+    """
+    result = execute_sql_query.invoke({"query": state["sql"]})
+    if result.startswith(SQL_ERROR_PREFIX):
+        return {
+            "result": "",
+            "error": result,
+            "attempts": state.get("attempts", 0) + 1,
+        }
+    return {"result": result, "error": ""}
+
+
+def answer(state: PipelineState) -> Dict[str, Any]:
+    """
+    Phrases the final answer from the grounding and query results.
+    """
+    if state["route"] == "database":
+        if state.get("error"):
+            findings = f"The query could not be executed:\n{state['error']}"
+        else:
+            findings = f"Query results:\n{state.get('result', '')}"
+    else:
+        findings = f"Knowledge base:\n{state.get('documents', '')}"
+
+    prompt = [
+        ("system", BEJO_SYSTEM_PROMPT),
+        (
+            "human",
+            f"Conversation history:\n{state.get('history', '')}\n\n"
+            f"User context:\n{state.get('context', '')}\n\n"
+            f"{findings}\n\n"
+            f"Question: {state['question']}",
+        ),
+    ]
+    content = get_model_router().get("answer").invoke(prompt).content
+    return {"answer": content, "messages": [AIMessage(content=content)]}
+
+
+def route_after_ground(state: PipelineState) -> str:
+    return "generate_sql" if state["route"] == "database" else "answer"
+
+
+def route_after_execute(state: PipelineState) -> str:
+    if state.get("error") and state.get("attempts", 0) <= MAX_SQL_REPAIRS:
+        return "generate_sql"
+    return "answer"
+
+
+class BejoPipeline:
+    """
+    Wraps the compiled graph with the same stream interface as the agent executor.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def _initial_state(self, question: str) -> PipelineState:
+        return {
+            "question": question,
+            "user_id": get_current_user(),
+            "session_id": get_current_session(),
+            "messages": [HumanMessage(content=question)],
+            "sql": "",
+            "result": "",
+            "error": "",
+            "attempts": 0,
+            "schema": "",
+            "documents": "",
+        }
+
+    def stream(self, inputs: Dict[str, str], config: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Runs the graph and yields {"messages": [...]} chunks for new answer messages.
+        """
+        state = self._initial_state(inputs["input"])
+        for update in self.graph.stream(state, config=config, stream_mode="updates"):
+            for values in update.values():
+                if values and values.get("messages"):
+                    yield {"messages": values["messages"]}
+
+    def invoke(self, inputs: Dict[str, str], config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Runs the graph and returns the final answer and generated SQL.
+        """
+        state = self.graph.invoke(self._initial_state(inputs["input"]), config=config)
+        return {"output": state.get("answer", ""), "sql": state.get("sql", "")}
+
+
+def create_bejo_pipeline() -> BejoPipeline:
+    """
+    Creates and returns the BEJO pipeline with per-thread checkpointing.
+
+    Returns:
+        BejoPipeline: The compiled pipeline.
+    """
+    builder = StateGraph(PipelineState)
+    builder.add_node("classify", classify)
+    builder.add_node("ground", ground)
+    builder.add_node("generate_sql", generate_sql)
+    builder.add_node("execute", execute)
+    builder.add_node("answer", answer)
+
+    builder.add_edge(START, "classify")
+    builder.add_edge("classify", "ground")
+    builder.add_conditional_edges("ground", route_after_ground, ["generate_sql", "answer"])
+    builder.add_edge("generate_sql", "execute")
+    builder.add_conditional_edges("execute", route_after_execute, ["generate_sql", "answer"])
+    builder.add_edge("answer", END)
+
+    return BejoPipeline(builder.compile(checkpointer=MemorySaver()))
+
+
+__all__ = ["create_bejo_pipeline", "BejoPipeline"]
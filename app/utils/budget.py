@@ -0,0 +1,289 @@
+"""
+Prompt budget utilities for BEJO SQL Assistant.
+Counts tokens per prompt component, enforces per-component limits and keeps a
+rolling summary of older conversation turns.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.budget import get_budget_config
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio shared by the Gemini and Llama tokenizers
+CHARS_PER_TOKEN = 4
+
+TRIMMED_MARKER = "\n...[trimmed]..."
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in a piece of text.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The estimated token count.
+    """
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, limit: int, keep: str = "head") -> str:
+    """
+    Truncates text so that it fits within a token limit.
+
+    Args:
+        text (str): The text to truncate.
+        limit (int): The maximum number of tokens to keep.
+        keep (str): "head" keeps the beginning of the text, "tail" keeps the end.
+
+    Returns:
+        str: The text, truncated with a marker if it did not fit.
+    """
+    if estimate_tokens(text) <= limit:
+        return text
+
+    max_chars = max(limit * CHARS_PER_TOKEN - len(TRIMMED_MARKER), 0)
+    if keep == "tail":
+        return TRIMMED_MARKER.lstrip("\n") + "\n" + text[len(text) - max_chars :]
+    return text[:max_chars] + TRIMMED_MARKER
+
+
+class PromptBudget:
+    """
+    Enforces per-component token limits and tracks how much each component used.
+    """
+
+    def __init__(
+        self, limits: Dict[str, int], recent_turns: int = 6, max_sessions: int = 256
+    ):
+        self.limits = limits
+        self.recent_turns = recent_turns
+        self.max_sessions = max_sessions
+        self.usage: Dict[str, int] = {}
+        # Rolling summaries per session, least recently used first
+        self._summaries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._summarizer = None
+        self._lock = threading.Lock()
+
+    def fit(self, component: str, text: str, keep: str = "head") -> str:
+        """
+        Fits a prompt component into its token limit.
+
+        Args:
+            component (str): The component name, e.g. "schema" or "documents".
+            text (str): The component text.
+            keep (str): Which end of the text to keep when trimming.
+
+        Returns:
+            str: The text, trimmed if it exceeded the component limit.
+        """
+        tokens = estimate_tokens(text)
+        limit = self.limits.get(component)
+
+        if limit is None or tokens <= limit:
+            self._record(component, tokens)
+            return text
+
+        trimmed = truncate_to_tokens(text, limit, keep=keep)
+        trimmed_tokens = estimate_tokens(trimmed)
+        self._record(component, trimmed_tokens)
+        logger.info(
+            f"Trimmed {component}: {tokens} -> {trimmed_tokens} tokens (limit {limit})"
+        )
+        return trimmed
+
+    def check(self, component: str, text: str) -> int:
+        """
+        Counts a component that cannot be trimmed and warns when it is over its limit.
+
+        Args:
+            component (str): The component name, e.g. "system".
+            text (str): The component text.
+
+        Returns:
+            int: The estimated token count.
+        """
+        tokens = estimate_tokens(text)
+        self._record(component, tokens)
+        limit = self.limits.get(component)
+        if limit is not None and tokens > limit:
+            logger.warning(f"{component} uses {tokens} tokens, over its limit of {limit}")
+        return tokens
+
+    def trim_intermediate_steps(
+        self, steps: List[Tuple[Any, Any]]
+    ) -> List[Tuple[Any, Any]]:
+        """
+        Keeps the agent scratchpad within the scratchpad budget.
+
+        Walks the steps from newest to oldest and replaces the observations of
+        older steps with a trimmed version once the budget is spent. Steps are
+        never dropped, so every tool call keeps its matching tool result.
+
+        Args:
+            steps (list): The (AgentAction, observation) pairs from AgentExecutor.
+
+        Returns:
+            list: The steps with older observations trimmed.
+        """
+        limit = self.limits.get("scratchpad")
+        if limit is None or not steps:
+            return steps
+
+        remaining = limit
+        trimmed_steps = []
+        trimmed_count = 0
+        for action, observation in reversed(steps):
+            text = str(observation)
+            tokens = estimate_tokens(text)
+            if tokens <= remaining:
+                remaining -= tokens
+                trimmed_steps.append((action, observation))
+                continue
+
+            trimmed_steps.append((action, truncate_to_tokens(text, max(remaining, 0))))
+            remaining = 0
+            trimmed_count += 1
+
+        trimmed_steps.reverse()
+        used = limit - remaining
+        self._record("scratchpad", used)
+        if trimmed_count:
+            logger.info(
+                f"Trimmed scratchpad: {trimmed_count} of {len(steps)} tool results "
+                f"shortened to fit {limit} tokens"
+            )
+        return trimmed_steps
+
+    def fit_history(self, session_id: str, entries: List[Dict[str, str]]) -> str:
+        """
+        Fits the conversation history into its budget using a rolling summary.
+
+        The newest entries are kept verbatim. Older entries are folded into a
+        summary that is updated incrementally. Folded entries are tracked by id,
+        so each entry is summarised once even if the store reorders or drops
+        entries between calls. Only calls for the same session wait on each
+        other's summary; the least recently used of more than max_sessions
+        summaries are dropped.
+
+        Args:
+            session_id (str): The session the history belongs to.
+            entries (list): {"id", "text"} dicts ordered oldest first, e.g. from
+                get_session_entries.
+
+        Returns:
+            str: The summary of older turns followed by the recent turns.
+        """
+        if len(entries) <= self.recent_turns:
+            return self.fit(
+                "history", "\n".join(entry["text"] for entry in entries), keep="tail"
+            )
+
+        older = entries[: -self.recent_turns]
+        recent = entries[-self.recent_turns :]
+
+        state = self._session_state(session_id)
+        with state["lock"]:
+            new_entries = [entry for entry in older if entry["id"] not in state["folded"]]
+            if new_entries:
+                state["summary"] = self._summarize(
+                    state["summary"], [entry["text"] for entry in new_entries]
+                )
+                state["folded"].update(entry["id"] for entry in new_entries)
+                logger.info(
+                    f"Folded {len(new_entries)} older turns into the summary for session {session_id}"
+                )
+            summary = state["summary"]
+
+        combined = (
+            f"Summary of earlier conversation:\n{summary}\n\n"
+            "Recent conversation:\n" + "\n".join(entry["text"] for entry in recent)
+        )
+        return self.fit("history", combined, keep="tail")
+
+    def _session_state(self, session_id: str) -> Dict[str, Any]:
+        """
+        Returns the summary state of a session, evicting the least recently used.
+        """
+        with self._lock:
+            state = self._summaries.pop(session_id, None) or {
+                "summary": "",
+                "folded": set(),
+                "lock": threading.Lock(),
+            }
+            self._summaries[session_id] = state
+            while len(self._summaries) > self.max_sessions:
+                evicted, _ = self._summaries.popitem(last=False)
+                logger.info(f"Dropped the history summary of session {evicted}")
+            return state
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the last recorded usage of each component against its limit.
+
+        Returns:
+            dict: Component name mapped to {"used": tokens, "limit": tokens}.
+        """
+        return {
+            component: {"used": used, "limit": self.limits.get(component, 0)}
+            for component, used in self.usage.items()
+        }
+
+    def _record(self, component: str, tokens: int) -> None:
+        self.usage[component] = tokens
+        logger.debug(f"Prompt budget {component}: {tokens} tokens")
+
+    def _summarize(self, summary: str, entries: List[str]) -> str:
+        summary_limit = max(self.limits.get("history", 0) // 2, 1)
+        new_text = "\n".join(entries)
+
+        try:
+            if self._summarizer is None:
+                from utils.router import get_model_router
+
+                self._summarizer = get_model_router().get("classify")
+
+            prompt = (
+                "Update the running summary of a conversation between a user and "
+                "BEJO, an SQL assistant. Keep facts, names, filters and numbers the "
+                "user may refer back to. Reply with the updated summary only.\n\n"
+                f"Current summary:\n{summary or '(empty)'}\n\n"
+                f"New turns:\n{new_text}"
+            )
+            updated = self._summarizer.invoke(prompt).content
+        except Exception as e:
+            logger.error(f"Error summarising conversation history: {str(e)}")
+            updated = f"{summary}\n{new_text}".strip()
+
+        return truncate_to_tokens(updated, summary_limit, keep="tail")
+
+
+_PROMPT_BUDGET: Optional[PromptBudget] = None
+
+
+def get_prompt_budget() -> PromptBudget:
+    """
+    Returns the shared PromptBudget, creating it from the environment on first use.
+
+    Returns:
+        PromptBudget: The shared prompt budget.
+    """
+    global _PROMPT_BUDGET
+    if _PROMPT_BUDGET is None:
+        config = get_budget_config()
+        _PROMPT_BUDGET = PromptBudget(
+            config["limits"],
+            recent_turns=config["recent_turns"],
+            max_sessions=config["max_sessions"],
+        )
+    return _PROMPT_BUDGET
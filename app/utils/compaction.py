@@ -0,0 +1,323 @@
+"""
+Session memory compaction for BEJO SQL Assistant.
+Expires session-scoped memories (those with a run_id) after a TTL and folds
+them into a few long-term facts per user, so the mem0 collection stops growing
+with every REPL session.
+"""
+
+import logging
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from config.memory import memory_retention_config
+from utils.memory import get_memory, scroll_points
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def _session_filter():
+    """
+    Returns a filter matching session-scoped memories (points that have a run_id).
+    """
+    from qdrant_client.models import Filter, IsEmptyCondition, PayloadField
+
+    return Filter(must_not=[IsEmptyCondition(is_empty=PayloadField(key="run_id"))])
+
+
+def _compaction_facts(memory, user_id: str) -> List[Any]:
+    """
+    Returns the points of the long-term facts written by compaction for a user.
+    """
+    from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+    scroll_filter = Filter(
+        must=[
+            FieldCondition(key="user_id", match=MatchValue(value=user_id)),
+            FieldCondition(key="source", match=MatchValue(value="compaction")),
+        ]
+    )
+    return list(scroll_points(memory, scroll_filter))
+
+
+def _latest_generation(facts: List[Any]) -> List[Any]:
+    """
+    Returns the facts written by the most recent compaction run.
+
+    Each run replaces the previous facts, so older generations only remain when
+    a run failed between writing its facts and deleting the old ones.
+    """
+    generations: Dict[Any, List[Any]] = defaultdict(list)
+    for point in facts:
+        generations[point.payload.get("compaction_id")].append(point)
+
+    def written_at(points: List[Any]) -> datetime:
+        moments = [_last_activity(point.payload) for point in points]
+        moments = [moment for moment in moments if moment is not None]
+        return max(moments, default=datetime.min.replace(tzinfo=timezone.utc))
+
+    return max(generations.values(), key=written_at, default=[])
+
+
+def _delete_points(memory, point_ids: List[Any]) -> None:
+    """
+    Deletes points from the mem0 collection in a single request.
+    """
+    from qdrant_client.models import PointIdsList
+
+    memory.vector_store.client.delete(
+        collection_name=memory.vector_store.collection_name,
+        points_selector=PointIdsList(points=point_ids),
+        wait=True,
+    )
+
+
+def _last_activity(payload: Dict[str, Any]) -> Optional[datetime]:
+    timestamp = payload.get("updated_at") or payload.get("created_at")
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def find_expired_sessions(memory, ttl_hours: float) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    Finds sessions whose most recent memory is older than the TTL.
+
+    Args:
+        memory (Memory): The mem0 memory.
+        ttl_hours (float): Hours of inactivity after which a session expires.
+
+    Returns:
+        dict: user_id -> run_id -> list of points in that expired session.
+    """
+    sessions: Dict[tuple, List[Any]] = defaultdict(list)
+    for point in scroll_points(memory, _session_filter()):
+        payload = point.payload or {}
+        sessions[(payload.get("user_id"), payload.get("run_id"))].append(point)
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=ttl_hours)
+    expired: Dict[str, Dict[str, List[Any]]] = defaultdict(dict)
+    for (user_id, run_id), points in sessions.items():
+        activity = [_last_activity(point.payload) for point in points]
+        activity = [moment for moment in activity if moment is not None]
+        if user_id and activity and max(activity) < cutoff:
+            expired[user_id][run_id] = points
+    return expired
+
+
+def summarize_facts(
+    memories: List[str], max_facts: int, existing: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Condenses session memories into at most max_facts long-term facts.
+
+    Args:
+        memories (List[str]): The memory texts of the expired sessions.
+        max_facts (int): Maximum number of facts to return.
+        existing (List[str], optional): The user's current long-term facts, merged
+            with the memories so the result replaces them.
+
+    Returns:
+        List[str]: The facts, one per entry.
+    """
+    from utils.router import get_model_router
+
+    prompt = (
+        f"Condense these memories from past conversations with one user of BEJO, "
+        f"an SQL assistant, into at most {max_facts} long-term facts worth "
+        "remembering (preferences, recurring questions, names, filters). Skip "
+        "one-off details. Merge them with the current facts, dropping duplicates "
+        "and facts the memories contradict. Reply with one fact per line and "
+        "nothing else.\n\n"
+        "Current facts:\n"
+        + ("\n".join(f"- {text}" for text in existing or []) or "(none)")
+        + "\n\nMemories:\n"
+        + "\n".join(f"- {text}" for text in memories)
+    )
+    reply = get_model_router().get("classify").invoke(prompt).content
+    facts = [re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip() for line in reply.splitlines()]
+    return [fact for fact in facts if fact][:max_facts]
+
+
+def compact_expired_sessions(
+    ttl_hours: Optional[float] = None,
+    max_facts: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Folds expired sessions into long-term facts and deletes the session memories.
+
+    A user's sessions are only deleted after their facts were written, so a
+    failed or empty summary leaves the sessions in place for the next run.
+
+    The summary merges the user's current compaction facts with the new
+    memories and replaces them, so each user keeps at most max_facts facts.
+    Facts record every run_id folded into them, and sessions already folded
+    are deleted without being summarized again, so a failed delete does not
+    duplicate facts. The sessions and the replaced facts are deleted in one
+    request.
+
+    Args:
+        ttl_hours (float, optional): Overrides MEMORY_SESSION_TTL_HOURS.
+        max_facts (int, optional): Overrides MEMORY_COMPACT_MAX_FACTS.
+        dry_run (bool): Only report what would be compacted.
+
+    Returns:
+        dict: Counts of users, sessions, deleted memories, added and replaced facts.
+    """
+    retention = memory_retention_config()
+    ttl_hours = ttl_hours if ttl_hours is not None else retention["session_ttl_hours"]
+    max_facts = max_facts if max_facts is not None else retention["max_facts"]
+
+    memory = get_memory()
+    expired = find_expired_sessions(memory, ttl_hours)
+    report = {
+        "users": 0,
+        "sessions": 0,
+        "deleted": 0,
+        "facts": 0,
+        "replaced_facts": 0,
+        "failed_users": 0,
+    }
+
+    for user_id, sessions in expired.items():
+        points = [point for session in sessions.values() for point in session]
+        report["users"] += 1
+        report["sessions"] += len(sessions)
+
+        if dry_run:
+            report["deleted"] += len(points)
+            continue
+
+        try:
+            stored_facts = _compaction_facts(memory, user_id)
+            current = _latest_generation(stored_facts)
+            folded = {
+                run_id
+                for point in current
+                for run_id in point.payload.get("compacted_runs", [])
+            }
+            pending = [run_id for run_id in sessions if run_id not in folded]
+            texts = [
+                point.payload.get("data", "")
+                for run_id in pending
+                for point in sessions[run_id]
+            ]
+            texts = [text for text in texts if text]
+            existing = [point.payload.get("data", "") for point in current]
+            facts = (
+                summarize_facts(texts, max_facts, [text for text in existing if text])
+                if texts
+                else []
+            )
+            if texts and not facts:
+                raise ValueError("the summary returned no facts")
+
+            if facts:
+                memory.add(
+                    [{"role": "user", "content": fact} for fact in facts],
+                    user_id=user_id,
+                    metadata={
+                        "source": "compaction",
+                        "compaction_id": str(uuid4()),
+                        # Every expired session is deleted below with the old facts
+                        "compacted_runs": sorted(sessions),
+                    },
+                    infer=False,
+                )
+                replaced = stored_facts
+            else:
+                # Keep the latest facts; drop generations left by a failed run
+                current_ids = {point.id for point in current}
+                replaced = [point for point in stored_facts if point.id not in current_ids]
+            _delete_points(memory, [point.id for point in points + replaced])
+        except Exception as e:
+            report["failed_users"] += 1
+            logger.error(f"Error compacting sessions for user {user_id}: {str(e)}")
+            continue
+
+        report["deleted"] += len(points)
+        report["facts"] += len(facts)
+        report["replaced_facts"] += len(replaced)
+        logger.info(
+            f"Compacted {len(sessions)} sessions ({len(points)} memories) "
+            f"for user {user_id} into {len(facts)} facts, replacing {len(replaced)}"
+        )
+
+    return report
+
+
+def collection_stats(
+    sample_user: Optional[str] = None, repeats: int = 5
+) -> Dict[str, Any]:
+    """
+    Returns the size of the mem0 collection and the latency of scoped lookups.
+
+    Args:
+        sample_user (str, optional): User whose get_all lookups are timed. Defaults
+            to the user with the most memories.
+        repeats (int): Number of timed lookups to average.
+
+    Returns:
+        dict: Point counts, session count and average lookup latencies in ms.
+    """
+    memory = get_memory()
+    client = memory.vector_store.client
+    collection_name = memory.vector_store.collection_name
+
+    total = client.count(collection_name=collection_name, exact=True).count
+    session_points = client.count(
+        collection_name=collection_name, count_filter=_session_filter(), exact=True
+    ).count
+
+    per_user = defaultdict(int)
+    sessions = set()
+    for point in scroll_points(memory):
+        payload = point.payload or {}
+        per_user[payload.get("user_id")] += 1
+        if payload.get("run_id"):
+            sessions.add((payload.get("user_id"), payload.get("run_id")))
+
+    stats = {
+        "points": total,
+        "session_points": session_points,
+        "long_term_points": total - session_points,
+        "sessions": len(sessions),
+        "users": len([user for user in per_user if user]),
+    }
+
+    sample_user = sample_user or max(
+        (user for user in per_user if user), key=per_user.get, default=None
+    )
+    if sample_user:
+        sample_session = next(
+            (run_id for user, run_id in sessions if user == sample_user), None
+        )
+        stats["sample_user"] = sample_user
+        stats["user_lookup_ms"] = _time_lookup(
+            lambda: memory.get_all(user_id=sample_user), repeats
+        )
+        if sample_session:
+            stats["session_lookup_ms"] = _time_lookup(
+                lambda: memory.get_all(user_id=sample_user, run_id=sample_session),
+                repeats,
+            )
+    return stats
+
+
+def _time_lookup(lookup, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        lookup()
+    return (time.perf_counter() - started) * 1000 / repeats
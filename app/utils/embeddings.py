@@ -0,0 +1,289 @@
+"""
+Embedding utilities for BEJO SQL Assistant.
+A shared Ollama embedding client that coalesces concurrent requests arriving
+within a short window into one batched call and fans the vectors back out.
+Used by the knowledge store, the mem0 embedder and ingestion.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from config.embeddings import get_embedding_config
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class _EmbeddingRequest:
+    __slots__ = ("text", "future", "enqueued")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class CoalescingEmbeddings(Embeddings):
+    """
+    LangChain Embeddings that micro-batches concurrent calls to Ollama's /api/embed.
+
+    Requests are collected for window_ms after the first one arrives (or until
+    max_batch_size is reached) and sent as one call. While all batch slots are
+    busy, new requests keep queueing, so batches grow with load.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        base_url: str,
+        window_ms: float = 10,
+        max_batch_size: int = 32,
+        max_concurrent_batches: int = 2,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        self.model = model
+        self.base_url = base_url
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        # Longest a caller waits: every attempt timing out plus the backoff between them
+        self.wait_timeout = (
+            self.window
+            + timeout * (max_retries + 1)
+            + backoff * (2**max_retries - 1)
+        )
+
+        self._client = None
+        self._queue: "queue.Queue[_EmbeddingRequest]" = queue.Queue()
+        self._slots = threading.Semaphore(max_concurrent_batches)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches, thread_name_prefix="bejo-embed"
+        )
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            "requests": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "deduplicated": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "call_seconds": 0.0,
+            "retries": 0,
+            "failures": 0,
+            "timeouts": 0,
+        }
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds a list of texts; they share batches with other concurrent callers.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: One vector per text.
+        """
+        requests = [self._submit(text) for text in texts]
+        return [self._wait(request) for request in requests]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embeds a single text.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The vector.
+        """
+        return self._wait(self._submit(text))
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns batching metrics since the client was created.
+
+        Returns:
+            dict: Request and batch counts, batch sizes, queue wait and call
+            latency in milliseconds, retries, failures and caller timeouts.
+        """
+        with self._lock:
+            m = dict(self._metrics)
+        batches = m["batches"] or 1
+        return {
+            "requests": m["requests"],
+            "batches": m["batches"],
+            "avg_batch_size": m["requests"] / batches,
+            "max_batch_size": m["max_batch_size"],
+            "deduplicated": m["deduplicated"],
+            "avg_wait_ms": m["wait_seconds"] * 1000 / (m["requests"] or 1),
+            "max_wait_ms": m["max_wait_seconds"] * 1000,
+            "avg_call_ms": m["call_seconds"] * 1000 / batches,
+            "retries": m["retries"],
+            "failures": m["failures"],
+            "timeouts": m["timeouts"],
+        }
+
+    def format_metrics(self) -> str:
+        """
+        Returns the metrics as a single human readable line.
+        """
+        m = self.metrics()
+        return (
+            f"requests={m['requests']} batches={m['batches']} "
+            f"avg_batch={m['avg_batch_size']:.1f} max_batch={m['max_batch_size']} "
+            f"avg_wait={m['avg_wait_ms']:.1f}ms max_wait={m['max_wait_ms']:.1f}ms "
+            f"avg_call={m['avg_call_ms']:.1f}ms retries={m['retries']} "
+            f"failures={m['failures']} timeouts={m['timeouts']}"
+        )
+
+    def _submit(self, text: str) -> _EmbeddingRequest:
+        self._ensure_dispatcher()
+        request = _EmbeddingRequest(text)
+        self._queue.put(request)
+        return request
+
+    def _wait(self, request: _EmbeddingRequest) -> List[float]:
+        try:
+            return request.future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            request.future.cancel()
+            with self._lock:
+                self._metrics["timeouts"] += 1
+            raise TimeoutError(
+                f"No embedding from {self.base_url} after {self.wait_timeout:.1f}s"
+            )
+
+    def _ensure_dispatcher(self) -> None:
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name="bejo-embed-dispatch", daemon=True
+                )
+                self._dispatcher.start()
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            # Wait for a free slot first, so requests pile up while batches are in flight
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+            self._executor.submit(self._send, batch)
+
+    def _send(self, batch: List[_EmbeddingRequest]) -> None:
+        try:
+            batch = [request for request in batch if not request.future.cancelled()]
+            if not batch:
+                return
+
+            dispatched = time.perf_counter()
+            texts = list(dict.fromkeys(request.text for request in batch))
+            vectors = self._embed_with_retry(texts)
+            call_seconds = time.perf_counter() - dispatched
+
+            by_text = dict(zip(texts, vectors))
+            for request in batch:
+                self._resolve(request, result=by_text[request.text])
+
+            waits = [dispatched - request.enqueued for request in batch]
+            with self._lock:
+                self._metrics["requests"] += len(batch)
+                self._metrics["batches"] += 1
+                self._metrics["max_batch_size"] = max(
+                    self._metrics["max_batch_size"], len(batch)
+                )
+                self._metrics["deduplicated"] += len(batch) - len(texts)
+                self._metrics["wait_seconds"] += sum(waits)
+                self._metrics["max_wait_seconds"] = max(
+                    self._metrics["max_wait_seconds"], max(waits)
+                )
+                self._metrics["call_seconds"] += call_seconds
+            logger.debug(
+                f"Embedded batch of {len(batch)} ({len(texts)} unique) in {call_seconds * 1000:.1f}ms"
+            )
+        except Exception as e:
+            with self._lock:
+                self._metrics["failures"] += 1
+            logger.error(f"Error embedding batch of {len(batch)}: {str(e)}")
+            for request in batch:
+                self._resolve(request, error=e)
+        finally:
+            self._slots.release()
+
+    def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._get_client().embed(model=self.model, input=texts)[
+                    "embeddings"
+                ]
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2**attempt
+                with self._lock:
+                    self._metrics["retries"] += 1
+                logger.warning(
+                    f"Embedding call failed ({str(e)}), retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    def _get_client(self):
+        if self._client is None:
+            from ollama import Client
+
+            self._client = Client(host=self.base_url, timeout=self.timeout)
+        return self._client
+
+    @staticmethod
+    def _resolve(request: _EmbeddingRequest, result=None, error=None) -> None:
+        try:
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(result)
+        except InvalidStateError:
+            # The caller timed out and cancelled the request
+            pass
+
+
+_EMBEDDING_CLIENT: Optional[CoalescingEmbeddings] = None
+_EMBEDDING_CLIENT_LOCK = threading.Lock()
+
+
+def get_embedding_client() -> CoalescingEmbeddings:
+    """
+    Returns the shared CoalescingEmbeddings, creating it from the environment on first use.
+
+    Returns:
+        CoalescingEmbeddings: The shared embedding client.
+    """
+    global _EMBEDDING_CLIENT
+    with _EMBEDDING_CLIENT_LOCK:
+        if _EMBEDDING_CLIENT is None:
+            _EMBEDDING_CLIENT = CoalescingEmbeddings(**get_embedding_config())
+    return _EMBEDDING_CLIENT
@@ -4,8 +4,9 @@ Handles saving and retrieving conversation memories.
 """
 
 import logging
-from typing import Dict, List, Any, Optional
-from mem0 import Memory
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Any, Optional
 from langchain_core.messages import HumanMessage, AIMessage
 
 from config.memory import mem0_config
@@ -16,6 +17,87 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Payload fields used to scope memory lookups; indexed so filters avoid full scans
+INDEXED_PAYLOAD_FIELDS = ("user_id", "run_id")
+
+SCROLL_BATCH_SIZE = 256
+
+_MEMORY = None
+_MEMORY_LOCK = threading.Lock()
+
+
+def get_memory():
+    """
+    Returns the shared mem0 Memory instance, creating it on first use.
+
+    Returns:
+        Memory: The mem0 memory configured by mem0_config().
+    """
+    global _MEMORY
+    with _MEMORY_LOCK:
+        if _MEMORY is None:
+            from mem0 import Memory
+
+            _MEMORY = Memory.from_config(mem0_config())
+            ensure_payload_indexes(_MEMORY)
+    return _MEMORY
+
+
+def ensure_payload_indexes(memory) -> None:
+    """
+    Creates keyword payload indexes on the scoping fields of the mem0 collection.
+
+    Qdrant otherwise evaluates user_id/run_id filters by scanning every point.
+    Creating an index that already exists is a no-op.
+
+    Args:
+        memory (Memory): The mem0 memory whose Qdrant collection is indexed.
+    """
+    from qdrant_client.models import PayloadSchemaType
+
+    client = memory.vector_store.client
+    collection_name = memory.vector_store.collection_name
+    for field in INDEXED_PAYLOAD_FIELDS:
+        try:
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
+        except Exception as e:
+            logger.warning(f"Could not index payload field {field}: {str(e)}")
+
+
+def scroll_points(memory, scroll_filter=None) -> Iterator[Any]:
+    """
+    Yields every point of the mem0 collection that matches a filter, without vectors.
+
+    Unlike get_all, which stops at its limit (100 by default), this pages
+    through all matching points.
+
+    Args:
+        memory (Memory): The mem0 memory whose Qdrant collection is read.
+        scroll_filter (Filter, optional): A Qdrant filter.
+
+    Yields:
+        Record: The matching points with their payloads.
+    """
+    client = memory.vector_store.client
+    collection_name = memory.vector_store.collection_name
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=SCROLL_BATCH_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        yield from points
+        if offset is None:
+            return
+
 
 def use_memory(state: Dict[str, str], user_id: str, config: Dict[str, Any]) -> None:
     """
@@ -37,7 +119,7 @@ def use_memory(state: Dict[str, str], user_id: str, config: Dict[str, Any]) -> N
         # Extract session ID from config
         session_id = config.get("configurable", {}).get("thread_id", "unknown-session")
 
-        m = Memory.from_config(mem0_config())
+        m = get_memory()
 
         # Session memory
         m.add(
@@ -83,7 +165,7 @@ def get_user_memories(
         str: A string containing all memories, one per line, in markdown format.
     """
     try:
-        m = Memory.from_config(mem0_config())
+        m = get_memory()
 
         if search and question:
             response = m.search(query=question, user_id=user_id)
@@ -95,18 +177,11 @@ def get_user_memories(
         if not response or not response.get("results"):
             return ""
 
-        formatted_memories = []
-        for item in response["results"]:
-            memory = item.get("memory", {})
-            if isinstance(memory, dict):
-                role = memory.get("role", "unknown")
-                content = memory.get("content", "")
-                if role == "user":
-                    formatted_memories.append(f"Human: {content}")
-                elif role == "assistant":
-                    formatted_memories.append(f"BEJO: {content}")
-            elif isinstance(memory, str):
-                formatted_memories.append(f"- {memory}")
+        formatted_memories = [
+            text
+            for text in (format_memory(item) for item in response["results"])
+            if text
+        ]
 
         return "\n".join(formatted_memories)
     except Exception as e:
@@ -114,6 +189,81 @@ def get_user_memories(
         return ""
 
 
+def format_memory(item: Dict[str, Any]) -> Optional[str]:
+    """
+    Formats one mem0 result as a "Human:", "BEJO:" or "- " line.
+
+    Args:
+        item (dict): A mem0 result with a "memory" field.
+
+    Returns:
+        str: The formatted memory, or None if it has no usable content.
+    """
+    memory = item.get("memory", {})
+    if isinstance(memory, dict):
+        role = memory.get("role", "unknown")
+        content = memory.get("content", "")
+        if role == "user":
+            return f"Human: {content}"
+        if role == "assistant":
+            return f"BEJO: {content}"
+        return None
+    if isinstance(memory, str):
+        return f"- {memory}"
+    return None
+
+
+def get_session_entries(user_id: str, session_id: str) -> List[Dict[str, str]]:
+    """
+    Get the memories of a session as entries ordered by creation time.
+
+    The whole session is scrolled, since get_all stops at 100 memories and
+    returns them in point id order, so the results are sorted by created_at here.
+
+    Args:
+        user_id (str): The user ID to retrieve memories for.
+        session_id (str): The session ID to retrieve memories for.
+
+    Returns:
+        List[Dict[str, str]]: One {"id", "created_at", "text"} dict per memory, oldest first.
+    """
+    from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+    session_filter = Filter(
+        must=[
+            FieldCondition(key="user_id", match=MatchValue(value=user_id)),
+            FieldCondition(key="run_id", match=MatchValue(value=session_id)),
+        ]
+    )
+    try:
+        points = list(scroll_points(get_memory(), session_filter))
+    except Exception as e:
+        logger.error(f"Error retrieving session memories: {str(e)}")
+        return []
+
+    entries = []
+    for point in points:
+        payload = point.payload or {}
+        text = format_memory({"memory": payload.get("data")})
+        if text:
+            entries.append(
+                {
+                    "id": str(point.id),
+                    "created_at": payload.get("created_at") or "",
+                    "text": text,
+                }
+            )
+    return sorted(entries, key=lambda entry: _created_at_key(entry["created_at"]))
+
+
+def _created_at_key(created_at: str) -> float:
+    # Compare as instants; mem0 timestamps carry a UTC offset that changes with DST
+    try:
+        return datetime.fromisoformat(created_at).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
 def format_chat_history(history: str) -> List[Dict[str, str]]:
     """
     Formats the chat history string into a list of message dictionaries.
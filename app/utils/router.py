@@ -0,0 +1,214 @@
+"""
+Model routing utilities for BEJO SQL Assistant.
+Dispatches each agent step to the cheapest adequate model tier and escalates
+SQL generation to a stronger tier when generated SQL fails to execute.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from config.llm import LLM_TIERS, get_llm, get_llm_settings
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SQL_ERROR_PREFIX = "Error executing SQL query"
+
+
+class TierStatsHandler(BaseCallbackHandler):
+    """
+    Callback handler that records call count, latency and token usage for one tier.
+    """
+
+    def __init__(self, tier: str):
+        self.tier = tier
+        self.calls = 0
+        self.latency = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._started: Dict[Any, float] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        started = self._started.pop(run_id, None)
+        input_tokens, output_tokens = _usage_from_result(response)
+
+        with self._lock:
+            self.calls += 1
+            if started is not None:
+                self.latency += time.perf_counter() - started
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._started.pop(run_id, None)
+
+
+def _usage_from_result(response) -> Tuple[int, int]:
+    """
+    Extracts (input_tokens, output_tokens) from an LLMResult.
+    """
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+    token_usage = (response.llm_output or {}).get("token_usage", {})
+    return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+
+class ModelRouter:
+    """
+    Holds one chat model per tier and picks the tier for each agent step.
+    """
+
+    def __init__(self):
+        self.settings = {tier: get_llm_settings(tier) for tier in LLM_TIERS}
+        self.stats = {tier: TierStatsHandler(tier) for tier in LLM_TIERS}
+        self.escalations = 0
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tier: str):
+        """
+        Returns the chat model for a tier, creating it on first use.
+
+        Args:
+            tier (str): One of "classify", "answer", "sql" or "escalate".
+
+        Returns:
+            BaseChatModel: The chat model for the tier.
+        """
+        with self._lock:
+            if tier not in self._models:
+                self._models[tier] = get_llm(tier, callbacks=[self.stats[tier]])
+                settings = self.settings[tier]
+                logger.info(
+                    f"Model tier {tier}: {settings['model_provider']}/{settings['model']} "
+                    f"(temperature {settings['temperature']})"
+                )
+            return self._models[tier]
+
+    def pick_agent_tier(self, intermediate_steps: List[Tuple[Any, Any]]) -> str:
+        """
+        Picks the tier for the next agent step from the tool calls made so far.
+
+        - No tool results yet, or only grounding results: "classify"
+        - Schema fetched but no successful query yet: "sql"
+        - Last query failed: "escalate"
+        - A query or knowledge lookup succeeded: "answer"
+
+        Args:
+            intermediate_steps (list): The (AgentAction, observation) pairs so far.
+
+        Returns:
+            str: The tier to use for the next step.
+        """
+        if not intermediate_steps:
+            return "classify"
+
+        action, observation = intermediate_steps[-1]
+        tool_name = getattr(action, "tool", "")
+
+        if tool_name == "execute_sql_query":
+            if str(observation).startswith(SQL_ERROR_PREFIX):
+                self.record_escalation()
+                return "escalate"
+            return "answer"
+        if tool_name == "retrieve_knowledge":
+            return "answer"
+        if any(getattr(step, "tool", "") == "get_db_schema" for step, _ in intermediate_steps):
+            return "sql"
+        return "classify"
+
+    def record_escalation(self) -> None:
+        """
+        Counts an escalation to the strongest tier.
+        """
+        with self._lock:
+            self.escalations += 1
+        logger.info("Generated SQL failed to execute, escalating to the escalate tier")
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns per-tier call count, average latency, token usage and cost.
+
+        - "offloaded_tokens": tokens handled by a tier whose model differs from
+          the escalate tier, i.e. tokens that did not go to the strongest model
+        - "cost": tokens priced at the tier's LLM_<TIER>_COST (per million tokens)
+        - "cost_saved": what the same tokens would have cost on the escalate
+          tier, minus "cost"
+
+        Returns:
+            dict: Tier name mapped to its statistics.
+        """
+        strongest = self.settings["escalate"]
+        report = {}
+        for tier, stats in self.stats.items():
+            settings = self.settings[tier]
+            tokens = stats.input_tokens + stats.output_tokens
+            same_model = (settings["model"], settings["model_provider"]) == (
+                strongest["model"],
+                strongest["model_provider"],
+            )
+            cost = tokens * settings["cost"] / 1_000_000
+            report[tier] = {
+                "model": settings["model"],
+                "calls": stats.calls,
+                "avg_latency": stats.latency / stats.calls if stats.calls else 0.0,
+                "input_tokens": stats.input_tokens,
+                "output_tokens": stats.output_tokens,
+                "offloaded_tokens": 0 if same_model else tokens,
+                "cost": cost,
+                "cost_saved": tokens * strongest["cost"] / 1_000_000 - cost,
+            }
+        return report
+
+    def format_report(self) -> str:
+        """
+        Returns the tier report as a human readable string.
+
+        Returns:
+            str: One line per tier plus the escalation count.
+        """
+        lines = []
+        for tier, stats in self.report().items():
+            lines.append(
+                f"{tier:<9} {stats['model']:<24} calls={stats['calls']} "
+                f"avg_latency={stats['avg_latency']:.2f}s "
+                f"tokens={stats['input_tokens']}/{stats['output_tokens']} "
+                f"offloaded={stats['offloaded_tokens']} "
+                f"cost={stats['cost']:.4f} saved={stats['cost_saved']:.4f}"
+            )
+        lines.append(f"escalations={self.escalations}")
+        return "\n".join(lines)
+
+
+_MODEL_ROUTER: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """
+    Returns the shared ModelRouter, creating it from the environment on first use.
+
+    Returns:
+        ModelRouter: The shared model router.
+    """
+    global _MODEL_ROUTER
+    if _MODEL_ROUTER is None:
+        _MODEL_ROUTER = ModelRouter()
+    return _MODEL_ROUTER
@@ -0,0 +1,390 @@
+"""
+SQL audit utilities for BEJO SQL Assistant.
+Records every statement the agent executes in a local SQLite store and analyses
+the log for slow query fingerprints and candidate indexes.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SQL_KEYWORDS = {
+    "where", "on", "join", "inner", "left", "right", "outer", "cross", "full",
+    "group", "order", "limit", "having", "union", "as", "using", "natural",
+    "straight_join", "set", "values", "select", "from",
+}
+
+# Comments, quoted strings and backtick identifiers in one pass, so a quote
+# inside a comment (or a comment marker inside a string) is not misread
+_TOKEN_RE = re.compile(
+    r"(?P<comment>--[^\n]*|#[^\n]*|/\*.*?\*/)"
+    r"|(?P<string>'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\")"
+    r"|(?P<identifier>`[^`]*`)",
+    re.DOTALL,
+)
+
+_WHERE_RE = re.compile(r"\bwhere\b", re.IGNORECASE)
+_WHERE_END_RE = re.compile(
+    r"\b(?:group\s+by|order\s+by|limit|having|union|window)\b", re.IGNORECASE
+)
+_ON_RE = re.compile(r"\bon\b", re.IGNORECASE)
+_ON_END_RE = re.compile(
+    r"\b(?:(?:inner|left|right|cross|full|natural)\s+(?:outer\s+)?)?join\b|\bwhere\b|"
+    r"\b(?:group\s+by|order\s+by|limit|having|union|window)\b",
+    re.IGNORECASE,
+)
+_SUBQUERY_RE = re.compile(r"\s*(?:select|with)\b", re.IGNORECASE)
+_TABLE_RE = re.compile(
+    r"\b(?:from|join)\s+`?(\w+)`?(?:\s+(?:as\s+)?`?(\w+)`?)?", re.IGNORECASE
+)
+_OPERATOR = r"(?:=|<>|!=|<=|>=|<|>|\bin\b|\blike\b|\bbetween\b|\bis\b)"
+_LEFT_COLUMN_RE = re.compile(r"(?:`?(\w+)`?\.)?`?(\w+)`?\s*" + _OPERATOR, re.IGNORECASE)
+_RIGHT_COLUMN_RE = re.compile(_OPERATOR + r"\s*`?(\w+)`?\.`?(\w+)`?", re.IGNORECASE)
+
+
+def _strip_literals(query: str) -> str:
+    """
+    Removes comments and replaces string and numeric literals with "?".
+
+    Identifier case is kept, so the result can be used to extract table and
+    column names.
+    """
+
+    def replace(match):
+        if match.group("comment"):
+            return " "
+        if match.group("string"):
+            return "?"
+        return match.group(0)
+
+    text = _TOKEN_RE.sub(replace, query)
+    text = re.sub(r"\b\d+(?:\.\d+)?\b", "?", text)
+    return re.sub(r"\s+", " ", text).strip().rstrip(";")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a SQL statement so that queries differing only in literals match.
+
+    Comments are removed, string and numeric literals become "?", IN lists
+    collapse to "(?)", and case and whitespace are normalized.
+
+    Args:
+        query (str): The SQL statement.
+
+    Returns:
+        str: The normalized statement.
+    """
+    text = _strip_literals(query).lower()
+    return re.sub(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", "in (?)", text)
+
+
+def _clause_bodies(text: str, start_re, end_re) -> List[str]:
+    """
+    Returns the text after each start_re match up to the end of that clause.
+
+    A clause ends at an end_re match or at the ")" closing a parenthesis opened
+    before it, both only at the clause's own nesting level, so function calls
+    and parenthesised groups inside the clause do not cut it short. Nested
+    subqueries are blanked; their own clauses are returned separately.
+    """
+    bodies = []
+    for match in start_re.finditer(text):
+        body = []
+        subquery = []
+        position = match.end()
+        while position < len(text):
+            char = text[position]
+            if char == "(":
+                subquery.append(bool(_SUBQUERY_RE.match(text, position + 1)))
+            elif char == ")":
+                if not subquery:
+                    break
+                subquery.pop()
+            elif not subquery and end_re.match(text, position):
+                break
+            body.append(" " if any(subquery) else char)
+            position += 1
+        bodies.append("".join(body))
+    return bodies
+
+
+def _blank_call_arguments(text: str) -> str:
+    """
+    Blanks the arguments of function calls and other non-subquery parentheses.
+
+    Keeps FROM inside EXTRACT(YEAR FROM ...) or TRIM(... FROM ...) from being
+    read as a table, while tables in subqueries stay visible.
+    """
+    chars = list(text)
+    subquery = []
+    for position, char in enumerate(text):
+        if char == "(":
+            subquery.append(bool(_SUBQUERY_RE.match(text, position + 1)))
+        elif char == ")":
+            if subquery:
+                subquery.pop()
+        elif subquery and not subquery[-1]:
+            chars[position] = " "
+    return "".join(chars)
+
+
+def fingerprint_query(query: str) -> Tuple[str, str]:
+    """
+    Returns (fingerprint, normalized) for a SQL statement.
+
+    Args:
+        query (str): The SQL statement.
+
+    Returns:
+        Tuple[str, str]: A short hash of the normalized statement and the statement itself.
+    """
+    normalized = normalize_query(query)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16], normalized
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Returns the nearest-rank percentile of a list of values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def filter_columns(query: str) -> Counter:
+    """
+    Counts the (table, column) pairs used in WHERE and JOIN ... ON conditions.
+
+    Aliases are resolved through the FROM/JOIN clauses. Unqualified columns are
+    attributed to the table only when the statement reads a single table.
+    Columns wrapped in a function call, e.g. DATE(created_at), are skipped since
+    a plain index on them would not be used.
+    Keywords and aliases are matched case-insensitively, but tables and columns
+    keep the case they are written in, as MySQL table names can be case-sensitive.
+
+    Args:
+        query (str): The SQL statement as executed.
+
+    Returns:
+        Counter: (table, column) -> number of occurrences.
+    """
+    text = _strip_literals(query)
+
+    aliases = {}
+    for table, alias in _TABLE_RE.findall(_blank_call_arguments(text)):
+        if table.lower() in SQL_KEYWORDS:
+            continue
+        aliases[table.lower()] = table
+        if alias and alias.lower() not in SQL_KEYWORDS:
+            aliases[alias.lower()] = table
+    tables = set(aliases.values())
+
+    conditions = _clause_bodies(text, _WHERE_RE, _WHERE_END_RE) + _clause_bodies(
+        text, _ON_RE, _ON_END_RE
+    )
+
+    columns = Counter()
+    for condition in conditions:
+        refs = _LEFT_COLUMN_RE.findall(condition) + _RIGHT_COLUMN_RE.findall(condition)
+        for qualifier, column in refs:
+            if column.lower() in SQL_KEYWORDS or column.lower() in aliases or column == "?":
+                continue
+            if qualifier:
+                table = aliases.get(qualifier.lower())
+            elif len(tables) == 1:
+                table = next(iter(tables))
+            else:
+                table = None
+            if table:
+                columns[(table, column)] += 1
+    return columns
+
+
+class SQLAuditLog:
+    """
+    SQLite-backed log of executed SQL statements.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sql_audit (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                executed_at REAL NOT NULL,
+                fingerprint TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                query TEXT NOT NULL,
+                duration_ms REAL NOT NULL,
+                rows INTEGER,
+                question TEXT,
+                user_id TEXT,
+                session_id TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_sql_audit_fingerprint ON sql_audit (fingerprint);
+            """
+        )
+
+    def record(
+        self,
+        query: str,
+        duration_ms: float,
+        rows: Optional[int] = None,
+        question: Optional[str] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Records one executed statement.
+
+        Args:
+            query (str): The SQL statement as executed.
+            duration_ms (float): Execution time in milliseconds.
+            rows (int, optional): Number of rows returned.
+            question (str, optional): The user question that led to the statement.
+            user_id (str, optional): The user who asked.
+            session_id (str, optional): The session the question was asked in.
+            error (str, optional): The error message if execution failed.
+        """
+        fingerprint, normalized = fingerprint_query(query)
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO sql_audit (executed_at, fingerprint, normalized, query, "
+                "duration_ms, rows, question, user_id, session_id, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time(),
+                    fingerprint,
+                    normalized,
+                    query,
+                    duration_ms,
+                    rows,
+                    question,
+                    user_id,
+                    session_id,
+                    error,
+                ),
+            )
+            self._connection.commit()
+
+    def fingerprint_stats(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Aggregates the log per fingerprint.
+
+        Args:
+            since (float, optional): Only include statements executed after this UNIX time.
+
+        Returns:
+            List[Dict[str, Any]]: Per fingerprint: count, errors, total_ms, avg_ms,
+            p95_ms, avg_rows, normalized statement and the latest successful sample query.
+        """
+        sql = (
+            "SELECT fingerprint, normalized, query, duration_ms, rows, error "
+            "FROM sql_audit"
+        )
+        params: Tuple = ()
+        if since is not None:
+            sql += " WHERE executed_at >= ?"
+            params = (since,)
+        sql += " ORDER BY id"
+
+        with self._lock:
+            records = self._connection.execute(sql, params).fetchall()
+
+        grouped: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"durations": [], "rows": [], "errors": 0}
+        )
+        for fingerprint, normalized, query, duration_ms, rows, error in records:
+            group = grouped[fingerprint]
+            group["normalized"] = normalized
+            if not error or "sample" not in group:
+                group["sample"] = query
+            group["durations"].append(duration_ms)
+            if rows is not None:
+                group["rows"].append(rows)
+            if error:
+                group["errors"] += 1
+
+        stats = []
+        for fingerprint, group in grouped.items():
+            durations = group["durations"]
+            stats.append(
+                {
+                    "fingerprint": fingerprint,
+                    "normalized": group["normalized"],
+                    "sample": group["sample"],
+                    "count": len(durations),
+                    "errors": group["errors"],
+                    "total_ms": sum(durations),
+                    "avg_ms": sum(durations) / len(durations),
+                    "p95_ms": percentile(durations, 95),
+                    "avg_rows": (
+                        sum(group["rows"]) / len(group["rows"]) if group["rows"] else 0
+                    ),
+                }
+            )
+        return stats
+
+    def candidate_indexes(
+        self, stats: List[Dict[str, Any]], limit: int = 10
+    ) -> List[Tuple[str, str, int]]:
+        """
+        Ranks the columns used most often in WHERE/JOIN conditions.
+
+        Each fingerprint contributes once per execution, so frequent queries weigh more.
+        Columns are read from the sample query, so they keep their original case.
+
+        Args:
+            stats (list): Output of fingerprint_stats.
+            limit (int): Maximum number of candidates.
+
+        Returns:
+            List[Tuple[str, str, int]]: (table, column, weighted occurrences).
+        """
+        totals = Counter()
+        # The first spelling seen of each (table, column), matched case-insensitively
+        names: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        for entry in stats:
+            for (table, column), occurrences in filter_columns(entry["sample"]).items():
+                key = (table.lower(), column.lower())
+                names.setdefault(key, (table, column))
+                totals[key] += occurrences * entry["count"]
+        return [(*names[key], n) for key, n in totals.most_common(limit)]
+
+
+_AUDIT_LOG: Optional[SQLAuditLog] = None
+_AUDIT_LOG_LOCK = threading.Lock()
+
+
+def get_audit_log() -> SQLAuditLog:
+    """
+    Returns the shared SQLAuditLog at SQL_AUDIT_DB (default "sql_audit.db").
+
+    Returns:
+        SQLAuditLog: The shared audit log.
+    """
+    global _AUDIT_LOG
+    with _AUDIT_LOG_LOCK:
+        if _AUDIT_LOG is None:
+            _AUDIT_LOG = SQLAuditLog(os.getenv("SQL_AUDIT_DB", "sql_audit.db"))
+    return _AUDIT_LOG
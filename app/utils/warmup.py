@@ -0,0 +1,145 @@
+"""
+Startup warm-up for BEJO SQL Assistant.
+Imports the agent modules and initialises the heavy clients in a background
+thread, so the first prompt appears before langchain, qdrant and mem0 load.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def _timed(name: str, fn: Callable[[], Any], timings: Dict[str, float]) -> Any:
+    started = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        timings[name] = time.perf_counter() - started
+
+
+def _run_in_daemon(name: str, fn: Callable[..., Any], *args) -> Future:
+    """
+    Runs fn(*args) in a daemon thread and returns a Future for its result.
+
+    Executor worker threads are joined at interpreter exit, so an unfinished
+    warm-up would keep Ctrl+C from quitting; daemon threads are not.
+    """
+    future: Future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name=name, daemon=True).start()
+    return future
+
+
+def _warm_llms() -> None:
+    from config.llm import LLM_TIERS
+    from utils.router import get_model_router
+
+    router = get_model_router()
+    for tier in LLM_TIERS:
+        router.get(tier)
+
+
+def _warm_database() -> None:
+    from config.db import get_database
+
+    get_database()
+
+
+def _warm_knowledge_store() -> None:
+    from agent import get_knowledge_store
+
+    get_knowledge_store().client.get_collections()
+
+
+def _warm_memory() -> None:
+    from utils.memory import get_memory
+
+    get_memory()
+
+
+def _build_agent(mode: str):
+    if mode == "pipeline":
+        from pipeline import create_bejo_pipeline
+
+        return create_bejo_pipeline()
+
+    from agent import create_bejo_agent
+
+    return create_bejo_agent()
+
+
+def _warm_clients(timings: Dict[str, float]) -> None:
+    """
+    Initialises the LLM, DB pool, Qdrant client and mem0 concurrently and logs
+    the warm-up timings. Failures are logged; the client is created again on
+    first use.
+    """
+    clients = {
+        "llm": _warm_llms,
+        "database": _warm_database,
+        "qdrant": _warm_knowledge_store,
+        "mem0": _warm_memory,
+    }
+    futures = {
+        name: _run_in_daemon(f"bejo-warmup-{name}", _timed, name, fn, timings)
+        for name, fn in clients.items()
+    }
+    for name, future in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            logger.warning(f"Warm-up of {name} failed: {str(e)}")
+
+    logger.info(
+        "Warm-up finished: "
+        + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items())
+    )
+
+
+def warm_up(mode: str = "agent"):
+    """
+    Builds the agent and starts initialising the LLM, DB pool, Qdrant client
+    and mem0 in the background.
+
+    Returns as soon as the agent is built, so a slow or unreachable client only
+    delays the questions that use it. Failing to build the agent is raised.
+
+    Args:
+        mode (str): "agent" or "pipeline".
+
+    Returns:
+        The agent executor or pipeline.
+    """
+    timings: Dict[str, float] = {}
+    agent = _timed("agent", lambda: _build_agent(mode), timings)
+    _run_in_daemon("bejo-warmup-clients", _warm_clients, timings)
+    return agent
+
+
+def start_warm_up(mode: str = "agent") -> Future:
+    """
+    Starts warm_up in a background thread.
+
+    Args:
+        mode (str): "agent" or "pipeline".
+
+    Returns:
+        Future: Resolves to the agent executor or pipeline.
+    """
+    return _run_in_daemon("bejo-warmup", warm_up, mode)
@@ -0,0 +1,82 @@
+import threading
+
+from utils.budget import PromptBudget
+
+
+def make_budget(folded_batches, max_sessions=256):
+    budget = PromptBudget({"history": 1000}, recent_turns=2, max_sessions=max_sessions)
+
+    def summarize(summary, texts):
+        folded_batches.append(list(texts))
+        return (summary + "\n" + "\n".join(texts)).strip()
+
+    budget._summarize = summarize
+    return budget
+
+
+def entries(ids):
+    return [{"id": f"m{i}", "text": f"- fact {i}"} for i in ids]
+
+
+def test_fit_history_folds_each_entry_once_when_entries_reorder():
+    folded = []
+    budget = make_budget(folded)
+
+    budget.fit_history("s", entries([0, 1, 2, 3, 4]))
+    history = budget.fit_history("s", entries([0, 1, 9, 2, 3, 4]))
+
+    assert folded == [["- fact 0", "- fact 1", "- fact 2"], ["- fact 9"]]
+    assert history.count("fact 2") == 1
+    assert history.endswith("- fact 3\n- fact 4")
+
+
+def test_fit_history_keeps_short_history_verbatim():
+    folded = []
+    budget = make_budget(folded)
+
+    assert budget.fit_history("s", entries([0, 1])) == "- fact 0\n- fact 1"
+    assert folded == []
+
+
+def test_fit_history_does_not_block_other_sessions_while_summarising():
+    budget = make_budget([])
+    started = threading.Event()
+    release = threading.Event()
+    summarize = budget._summarize
+
+    def slow_summarize(summary, texts):
+        if "- fact 0" in texts:
+            started.set()
+            release.wait(5)
+        return summarize(summary, texts)
+
+    budget._summarize = slow_summarize
+    slow = threading.Thread(target=budget.fit_history, args=("a", entries([0, 1, 2])))
+    slow.start()
+    assert started.wait(5)
+
+    other = {}
+    fast = threading.Thread(
+        target=lambda: other.update(history=budget.fit_history("b", entries([5, 6, 7])))
+    )
+    fast.start()
+    fast.join(2)
+    finished_first = not fast.is_alive()
+
+    release.set()
+    slow.join(5)
+    fast.join(5)
+    assert finished_first
+    assert other["history"].endswith("- fact 6\n- fact 7")
+
+
+def test_fit_history_drops_least_recently_used_sessions():
+    folded = []
+    budget = make_budget(folded, max_sessions=1)
+
+    budget.fit_history("a", entries([0, 1, 2]))
+    budget.fit_history("b", entries([0, 1, 2]))
+    budget.fit_history("a", entries([0, 1, 2]))
+
+    assert list(budget._summaries) == ["a"]
+    assert folded == [["- fact 0"], ["- fact 0"], ["- fact 0"]]
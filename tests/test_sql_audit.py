@@ -0,0 +1,81 @@
+from utils.sql_audit import SQLAuditLog, filter_columns, normalize_query, percentile
+
+
+def test_normalize_query_ignores_quotes_inside_comments():
+    query = (
+        "SELECT name FROM Orders -- customer's orders\n"
+        "WHERE status = 'paid' AND id IN (1, 2, 3);"
+    )
+
+    assert normalize_query(query) == (
+        "select name from orders where status = ? and id in (?)"
+    )
+
+
+def test_normalize_query_keeps_comment_markers_inside_strings():
+    query = "SELECT id FROM notes WHERE body = 'see -- below' AND tag = '#1'"
+
+    assert normalize_query(query) == "select id from notes where body = ? and tag = ?"
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 21))
+
+    assert percentile(values, 95) == 19
+    assert percentile(values, 50) == 10
+    assert percentile(values, 100) == 20
+    assert percentile([7.0], 95) == 7.0
+
+
+def test_filter_columns_keeps_identifier_case():
+    query = (
+        "SELECT o.Total FROM Orders o JOIN Customers AS C ON o.CustomerID = c.ID "
+        "WHERE O.Status = 'paid'"
+    )
+
+    assert filter_columns(query) == {
+        ("Orders", "CustomerID"): 1,
+        ("Customers", "ID"): 1,
+        ("Orders", "Status"): 1,
+    }
+
+
+def test_candidate_indexes_match_columns_case_insensitively(tmp_path):
+    audit = SQLAuditLog(str(tmp_path / "audit.db"))
+    audit.record("SELECT id FROM Orders WHERE Status = 'paid'", 5.0)
+    audit.record("select id from Orders where status = 'open' limit 5", 7.0)
+
+    candidates = audit.candidate_indexes(audit.fingerprint_stats())
+
+    assert candidates == [("Orders", "Status", 2)]
+
+
+def test_filter_columns_reads_past_function_calls_in_where():
+    query = (
+        "SELECT o.id FROM orders o "
+        "WHERE DATE(o.created_at) >= '2024-01-01' AND o.status = 'x'"
+    )
+
+    assert filter_columns(query) == {("orders", "status"): 1}
+
+
+def test_filter_columns_reads_past_parenthesised_groups():
+    query = (
+        "SELECT id FROM orders "
+        "WHERE (status = 'a' OR region = 'b') AND customer_id = 3 ORDER BY id"
+    )
+
+    assert filter_columns(query) == {
+        ("orders", "status"): 1,
+        ("orders", "region"): 1,
+        ("orders", "customer_id"): 1,
+    }
+
+
+def test_filter_columns_ignores_from_inside_function_calls():
+    query = (
+        "SELECT EXTRACT(YEAR FROM created_at) AS year, COUNT(*) "
+        "FROM orders WHERE status = 'x' GROUP BY year"
+    )
+
+    assert filter_columns(query) == {("orders", "status"): 1}
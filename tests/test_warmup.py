@@ -0,0 +1,24 @@
+import threading
+
+import pytest
+
+from utils.warmup import _run_in_daemon
+
+
+def test_run_in_daemon_resolves_future_from_daemon_thread():
+    seen = {}
+
+    def work(value):
+        seen["daemon"] = threading.current_thread().daemon
+        return value * 2
+
+    assert _run_in_daemon("test-warmup", work, 21).result(timeout=5) == 42
+    assert seen["daemon"] is True
+
+
+def test_run_in_daemon_propagates_errors():
+    def fail():
+        raise RuntimeError("no qdrant")
+
+    with pytest.raises(RuntimeError, match="no qdrant"):
+        _run_in_daemon("test-warmup", fail).result(timeout=5)